@@ -0,0 +1,116 @@
+"""
+End-to-end benchmark against local fixtures, with no network access.
+
+Starts one page server per entry in FreeProxy.SOURCES, an origin server for
+test_url and a farm of stub proxies, then times get_proxy_list(), get() and
+bulk validation of every candidate.
+
+Usage:
+    python benchmarks/bench_offline.py [--proxies 200] [--latency 0.05]
+        [--fail-rate 0.2] [--blackhole-rate 0.1] [--dead-rate 0.2] [--precheck-timeout 0.2]
+        [--json results.json] [--baseline previous.json --tolerance 0.25]
+
+With --baseline the script exits non-zero when any timing is slower than the
+baseline by more than the tolerance, so it can gate CI.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from freeproxy import FreeProxy, Protocol
+from fixtures import OriginServer, ProxyFarm, build_sources
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+def run(args):
+    farm = ProxyFarm(
+        args.proxies,
+        latency=args.latency,
+        fail_rate=args.fail_rate,
+        blackhole_rate=args.blackhole_rate,
+        dead_rate=args.dead_rate
+    )
+    origin = OriginServer()
+    servers = build_sources(farm, rows_per_source=args.rows)
+
+    class LocalFreeProxy(FreeProxy):
+        SOURCES = servers.sources
+
+    def client():
+        return LocalFreeProxy(
+            protocol=Protocol(args.protocol),
+            test_url=origin.url,
+            timeout=args.timeout,
+            precheck_timeout=args.precheck_timeout,
+            max_proxies=args.rows * len(servers.sources)
+        )
+
+    results = {}
+    try:
+        with client() as fp:
+            results['get_proxy_list'], candidates = timed(fp.get_proxy_list)
+            duplicates = fp.last_scrape_report['duplicates']
+        with client() as fp:
+            results['get'], _ = timed(lambda: fp.get(max_retries=0))
+        with client() as fp:
+            results['bulk_validation'], working = timed(lambda: list(fp.iter_proxies()))
+        with client() as fp:
+            results['sorted_by_latency'], _ = timed(lambda: fp.get_proxy_list(sort_by='latency'))
+            stages = fp.last_validation_report
+    finally:
+        servers.close()
+        origin.close()
+        farm.close()
+
+    print(f"farm: {len(farm.endpoints)} proxies ({farm.count('ok')} ok, {farm.count('fail')} fail, "
+          f"{farm.count('blackhole')} blackhole, {farm.count('dead')} dead), {len(candidates)} candidates, {duplicates} duplicates dropped")
+    for name, seconds in results.items():
+        print(f"{name:<16} {seconds * 1000:9.1f} ms")
+    print(f"working proxies found: {len(working)}")
+    print(f"stages: precheck removed {stages['precheck_removed']} in {stages['precheck_seconds'] * 1000:.1f} ms, "
+          f"http removed {stages['http_removed']} in {stages['http_seconds'] * 1000:.1f} ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--proxies', type=int, default=200)
+    parser.add_argument('--rows', type=int, default=200, help='rows per source page')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--fail-rate', type=float, default=0.2)
+    parser.add_argument('--blackhole-rate', type=float, default=0.1)
+    parser.add_argument('--dead-rate', type=float, default=0.2)
+    parser.add_argument('--timeout', type=float, default=1.0)
+    parser.add_argument('--precheck-timeout', type=float, default=None)
+    parser.add_argument('--protocol', default='http', choices=[protocol.value for protocol in Protocol])
+    parser.add_argument('--json', help='write timings to this file')
+    parser.add_argument('--baseline', help='compare against timings from a previous --json run')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run(args)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = [
+            name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * (1 + args.tolerance)
+        ]
+        for name in regressions:
+            print(f"REGRESSION {name}: {results[name]:.3f}s vs baseline {baseline[name]:.3f}s")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Parsing benchmark: regex fast path vs the lxml DOM path.
+
+Usage: python benchmarks/bench_parser.py [--pages DIR] [--sizes 100,1000,10000,50000]
+
+--pages points at saved copies of the source pages, named <source>.html
+(e.g. socks-proxy.html); every file found there is benchmarked too.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from freeproxy import FreeProxy
+from pages import make_rows, render_page
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def compare(fp, label, content, source_name):
+    repeat = 3 if len(content) > 1_000_000 else 10
+    dom_time, dom_rows = best_of(lambda: fp._parse_source_dom(content, source_name), repeat)
+    fast_time, fast_rows = best_of(lambda: fp._parse_source(content, source_name), repeat)
+    same = [proxy.to_row()[:-1] for proxy in dom_rows] == [proxy.to_row()[:-1] for proxy in fast_rows]
+    print(f"{label:<24} rows {len(dom_rows):>6}   dom {dom_time * 1000:9.2f} ms   fast {fast_time * 1000:9.2f} ms   "
+          f"x{dom_time / fast_time if fast_time else float('inf'):5.1f}   {'match' if same else 'MISMATCH'}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', help='directory with saved <source>.html pages')
+    parser.add_argument('--sizes', default='100,1000,10000,50000')
+    args = parser.parse_args()
+
+    fp = FreeProxy(fast_parser=True)
+
+    if args.pages:
+        for name in sorted(os.listdir(args.pages)):
+            if name.endswith('.html'):
+                with open(os.path.join(args.pages, name), 'rb') as f:
+                    compare(fp, name, f.read(), name[:-len('.html')])
+
+    for size in (int(value) for value in args.sizes.split(',')):
+        compare(fp, f"synthetic {size}", render_page(make_rows(size)), 'general')
+        compare(fp, f"synthetic socks {size}", render_page(make_rows(size, socks=True), socks=True), 'socks-proxy')
+
+    fp.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Memory and CPU comparison of Proxy records against the old per-row dicts.
+
+Usage: python benchmarks/bench_records.py [rows]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from freeproxy import FreeProxy, Protocol, ProxyAnonymity
+
+CODES = [('US', 'United States'), ('DE', 'Germany'), ('BR', 'Brazil'), ('IN', 'India'), ('RU', 'Russia')]
+ANONYMITY = ['transparent', 'anonymous', 'elite proxy']
+
+def make_cells(rows):
+    rng = random.Random(0)
+    cells = []
+    for i in range(rows):
+        code, country = rng.choice(CODES)
+        cells.append([
+            f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            str(rng.choice([80, 3128, 8080, 8888, rng.randint(1024, 65535)])),
+            code,
+            country,
+            rng.choice(ANONYMITY),
+            rng.choice(['yes', 'no']),
+            rng.choice(['yes', 'no']),
+            f"{rng.randint(1, 59)} mins ago"
+        ])
+    return cells
+
+def legacy_row(cells):
+    """The dict-building code FreeProxy used before Proxy records"""
+    return {
+        'ip': cells[0],
+        'port': cells[1],
+        'code': cells[2],
+        'country': cells[3],
+        'anonymity': cells[4],
+        'google': cells[5],
+        'https': cells[6],
+        'last_checked': cells[7],
+        'protocol': 'HTTPS' if cells[6] == 'yes' else 'HTTP',
+        'region': 'Other'
+    }
+
+def legacy_filter(fp, proxies):
+    """The string-based filter FreeProxy used before Proxy records"""
+    filtered = []
+    for proxy in proxies:
+        if fp.countries and proxy['code'] not in fp.countries:
+            continue
+        anonymity = proxy['anonymity'].lower()
+        if fp.anonymity_level == ProxyAnonymity.ELITE and not ('elite' in anonymity or 'high' in anonymity):
+            continue
+        if fp.google_compatible and proxy['google'].lower() != 'yes':
+            continue
+        if fp.protocol == Protocol.HTTPS and proxy['https'].lower() != 'yes':
+            continue
+        if fp.protocol.value.upper() not in proxy['protocol']:
+            continue
+        filtered.append(proxy)
+    return filtered
+
+def measure(label, build, filter_rows):
+    started = time.perf_counter()
+    rows = build()
+    build_time = time.perf_counter() - started
+
+    # Measured separately: tracemalloc slows allocation-heavy code several times over
+    del rows
+    tracemalloc.start()
+    rows = build()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(10):
+        matches = filter_rows(rows)
+    filter_time = (time.perf_counter() - started) / 10
+
+    print(f"{label:<8} build {build_time * 1000:8.1f} ms   memory {memory / 1024 / 1024:7.1f} MiB   "
+          f"filter {filter_time * 1000:7.1f} ms   matches {len(matches)}")
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cells = make_cells(rows)
+    fp = FreeProxy(
+        countries=['US', 'DE'],
+        protocol=Protocol.HTTPS,
+        anonymity_level=ProxyAnonymity.ELITE,
+        google_compatible=True
+    )
+    print(f"{rows} rows")
+    measure('dict', lambda: [legacy_row(row) for row in cells], lambda proxies: legacy_filter(fp, proxies))
+    measure('Proxy', lambda: [fp._parse_row(row, 'general') for row in cells], fp._filter_proxies)
+    fp.close()
+
+if __name__ == '__main__':
+    main()
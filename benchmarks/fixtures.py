@@ -0,0 +1,289 @@
+"""
+Local fixtures for offline benchmarks: source page servers, an origin server
+standing in for test_url, and a farm of stub HTTP/CONNECT/SOCKS proxies.
+
+Everything listens on 127.0.0.1 and runs in background threads, so the
+benchmarks never touch the network.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import random
+import socket
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pages import make_rows, render_page
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body, content_type='text/html', headers=()):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+class _PageHandler(_QuietHandler):
+    """Serves a source page with ETag/Last-Modified revalidation and gzip, like the real list sites"""
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        if self.headers.get('If-None-Match') == server.etag:
+            server.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', server.etag)
+            self.end_headers()
+            return
+
+        headers = [('ETag', server.etag), ('Last-Modified', 'Sat, 01 Jan 2000 00:00:00 GMT')]
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            headers.append(('Content-Encoding', 'gzip'))
+            self._reply(server.compressed, headers=headers)
+        else:
+            self._reply(server.page, headers=headers)
+
+class _OriginHandler(_QuietHandler):
+    def do_GET(self):
+        self._reply(b'<html><title>Google</title><body>google test page</body></html>')
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # The default backlog of 5 drops bursts of concurrent probes
+
+def _serve(handler, **attributes):
+    server = _Server(('127.0.0.1', 0), handler)
+    for name, value in attributes.items():
+        setattr(server, name, value)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class OriginServer:
+    """Stands in for test_url"""
+
+    def __init__(self):
+        self._server = _serve(_OriginHandler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/test"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+class SourceServers:
+    """
+    One page server per source name, so per-host politeness limits apply to
+    each source separately just like the real sites on different hosts.
+    """
+
+    def __init__(self, pages):
+        self._servers = {}
+        self.sources = {}
+        for name, page in pages.items():
+            server = self._servers[name] = _serve(
+                _PageHandler,
+                page=page,
+                compressed=gzip.compress(page),
+                etag='"%s"' % hashlib.md5(page).hexdigest(),
+                requests=0,
+                not_modified=0
+            )
+            self.sources[name] = f"http://127.0.0.1:{server.server_address[1]}/{name}"
+
+    def set_page(self, name, page):
+        server = self._servers[name]
+        server.page = page
+        server.compressed = gzip.compress(page)
+        server.etag = '"%s"' % hashlib.md5(page).hexdigest()
+
+    def stats(self):
+        return {name: (server.requests, server.not_modified) for name, server in self._servers.items()}
+
+    def close(self):
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+
+class ProxyFarm:
+    """
+    Stub proxies speaking HTTP (absolute-URI GET and CONNECT), SOCKS4 and
+    SOCKS5, all served from one asyncio loop in a background thread.
+
+    Each stub gets a behaviour: 'ok' relays to the real target after
+    `latency` seconds, 'fail' drops the connection after reading the
+    request, and 'blackhole' accepts and then never answers. Dead endpoints
+    (connection refused) come from ports that nothing listens on.
+    """
+
+    def __init__(self, count, latency=0.05, fail_rate=0.2, blackhole_rate=0.1, dead_rate=0.2, seed=0):
+        rng = random.Random(seed)
+        self.latency = latency
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self._servers = []
+        self._held = set()
+        self.endpoints = []
+
+        for _ in range(count):
+            roll = rng.random()
+            if roll < dead_rate:
+                self.endpoints.append(('127.0.0.1', self._free_port(), 'dead'))
+                continue
+            if roll < dead_rate + fail_rate:
+                behaviour = 'fail'
+            elif roll < dead_rate + fail_rate + blackhole_rate:
+                behaviour = 'blackhole'
+            else:
+                behaviour = 'ok'
+            port = asyncio.run_coroutine_threadsafe(self._start(behaviour), self.loop).result()
+            self.endpoints.append(('127.0.0.1', port, behaviour))
+
+    @staticmethod
+    def _free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    @property
+    def hosts(self):
+        return [(ip, port) for ip, port, _ in self.endpoints]
+
+    def count(self, behaviour):
+        return sum(1 for endpoint in self.endpoints if endpoint[2] == behaviour)
+
+    async def _start(self, behaviour):
+        server = await asyncio.start_server(
+            lambda reader, writer: self._handle(reader, writer, behaviour), '127.0.0.1', 0, backlog=1024
+        )
+        self._servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer, behaviour):
+        try:
+            first = await reader.readexactly(1)
+            if behaviour == 'blackhole':
+                self._held.add(writer)
+                await reader.read()  # Hold the connection until the client gives up
+                return
+            if behaviour == 'fail':
+                return
+            await asyncio.sleep(self.latency)
+
+            if first == b'\x05':
+                target = await self._socks5(reader, writer)
+                await self._relay(reader, writer, target)
+            elif first == b'\x04':
+                target = await self._socks4(reader, writer)
+                await self._relay(reader, writer, target)
+            else:
+                await self._http(first, reader, writer)
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError, OSError):
+            pass  # Cancelled only on shutdown
+        finally:
+            self._held.discard(writer)
+            writer.close()
+
+    async def _http(self, first, reader, writer):
+        head = first + await reader.readuntil(b'\r\n\r\n')
+        request_line, _, rest = head.partition(b'\r\n')
+        method, target, version = request_line.split(b' ', 2)
+
+        if method == b'CONNECT':
+            host, _, port = target.decode().rpartition(':')
+            writer.write(b'HTTP/1.1 200 Connection established\r\n\r\n')
+            await writer.drain()
+            await self._relay(reader, writer, (host, int(port)))
+            return
+
+        # Absolute-URI request: forward it in origin form
+        url = target.decode()
+        host_port, _, path = url.split('://', 1)[1].partition('/')
+        host, _, port = host_port.partition(':')
+        forwarded = b' '.join([method, b'/' + path.encode(), version]) + b'\r\n' + rest
+        await self._relay(reader, writer, (host, int(port or 80)), forwarded)
+
+    async def _socks5(self, reader, writer):
+        methods = await reader.readexactly(1)
+        await reader.readexactly(methods[0])
+        writer.write(b'\x05\x00')
+        _, command, _, address_type = await reader.readexactly(4)
+        if address_type == 1:
+            host = socket.inet_ntoa(await reader.readexactly(4))
+        elif address_type == 3:
+            length = await reader.readexactly(1)
+            host = (await reader.readexactly(length[0])).decode()
+        else:
+            host = socket.inet_ntop(socket.AF_INET6, await reader.readexactly(16))
+        port = struct.unpack('!H', await reader.readexactly(2))[0]
+        writer.write(b'\x05\x00\x00\x01' + socket.inet_aton('127.0.0.1') + struct.pack('!H', 0))
+        return host, port
+
+    async def _socks4(self, reader, writer):
+        _, port, address = struct.unpack('!BH4s', await reader.readexactly(7))
+        await reader.readuntil(b'\x00')  # user id
+        host = socket.inet_ntoa(address)
+        if address.startswith(b'\x00\x00\x00') and address != b'\x00\x00\x00\x00':
+            host = (await reader.readuntil(b'\x00'))[:-1].decode()  # SOCKS4a host name
+        writer.write(b'\x00\x5a' + struct.pack('!H', port) + address)
+        return host, port
+
+    async def _relay(self, reader, writer, target, initial=b''):
+        upstream_reader, upstream_writer = await asyncio.open_connection(*target)
+        if initial:
+            upstream_writer.write(initial)
+
+        async def pipe(source, sink):
+            try:
+                while True:
+                    data = await source.read(65536)
+                    if not data:
+                        break
+                    sink.write(data)
+                    await sink.drain()
+            except (ConnectionError, OSError):
+                pass
+            finally:
+                if sink.can_write_eof():
+                    try:
+                        sink.write_eof()
+                    except OSError:
+                        pass
+
+        await asyncio.gather(pipe(reader, upstream_writer), pipe(upstream_reader, writer))
+        upstream_writer.close()
+
+    def close(self):
+        async def shutdown():
+            for server in self._servers:
+                server.close()
+            for writer in list(self._held):
+                writer.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+def build_sources(farm, rows_per_source=200, seed=0):
+    """
+    Pages for every name in FreeProxy.SOURCES. Rows cycle through the farm's
+    endpoints, so sources overlap the way the real lists do.
+    """
+    from freeproxy import FreeProxy
+
+    pages = {}
+    for i, name in enumerate(FreeProxy.SOURCES):
+        socks = 'socks' in name
+        rows = make_rows(rows_per_source, socks=socks, seed=seed + i, hosts=farm.hosts)
+        pages[name] = render_page(rows, socks=socks)
+    return SourceServers(pages)
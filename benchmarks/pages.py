@@ -0,0 +1,49 @@
+"""Synthetic source pages in the fpl-list table layout used by SOURCES."""
+
+import random
+
+COUNTRIES = [
+    ('US', 'United States'), ('DE', 'Germany'), ('BR', 'Brazil'), ('IN', 'India'),
+    ('ID', 'Indonesia'), ('RU', 'Russian Federation'), ('GB', 'United Kingdom'), ('CN', 'China')
+]
+ANONYMITY = ['transparent', 'anonymous', 'elite proxy']
+
+def make_rows(count, socks=False, seed=0, hosts=None):
+    """Return `count` rows of cell strings; `hosts` overrides the (ip, port) pairs"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        if hosts:
+            ip, port = hosts[i % len(hosts)]
+        else:
+            ip = f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            port = rng.choice([80, 3128, 8080, 8888, rng.randint(1024, 65535)])
+        code, country = rng.choice(COUNTRIES)
+        age = f"{rng.randint(1, 59)} {'secs' if rng.random() < 0.3 else 'mins'} ago"
+        if socks:
+            rows.append([ip, str(port), code, country, rng.choice(['Socks4', 'Socks5']),
+                         rng.choice(ANONYMITY), rng.choice(['yes', 'no']), age])
+        else:
+            rows.append([ip, str(port), code, country, rng.choice(ANONYMITY),
+                         rng.choice(['yes', 'no']), rng.choice(['yes', 'no']), age])
+    return rows
+
+def render_page(rows, socks=False):
+    """Render rows the way the free-proxy-list.net family of sites does"""
+    if socks:
+        header = ['IP Address', 'Port', 'Code', 'Country', 'Version', 'Anonymity', 'Https', 'Last Checked']
+    else:
+        header = ['IP Address', 'Port', 'Code', 'Country', 'Anonymity', 'Google', 'Https', 'Last Checked']
+    classes = ['', '', '', " class='hm'", '', " class='hm'", " class='hx'", " class='hm'"]
+
+    parts = [
+        '<!DOCTYPE html><html><head><title>Free Proxy List</title></head><body>',
+        '<section id="list"><div class="container"><div class="table-responsive fpl-list">',
+        '<table class="table table-striped table-bordered"><thead><tr>',
+        ''.join(f'<th{cls}>{name}</th>' for cls, name in zip(classes, header)),
+        '</tr></thead><tbody>'
+    ]
+    for row in rows:
+        parts.append('<tr>' + ''.join(f'<td{cls}>{cell}</td>' for cls, cell in zip(classes, row)) + '</tr>')
+    parts.append('</tbody><tfoot></tfoot></table></div></div></section></body></html>')
+    return ''.join(parts).encode('utf-8')
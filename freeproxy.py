@@ -1,22 +1,58 @@
-print("""
-██╗   ██╗██╗   ██╗███████╗██╗   ██╗███████╗    ██████╗  ██████╗ ██╗      █████╗ ████████╗
-╚██╗ ██╔╝██║   ██║██╔════╝██║   ██║██╔════╝    ██╔══██╗██╔═══██╗██║     ██╔══██╗╚══██╔══╝
- ╚████╔╝ ██║   ██║███████╗██║   ██║█████╗      ██████╔╝██║   ██║██║     ███████║   ██║   
-  ╚██╔╝  ██║   ██║╚════██║██║   ██║██╔══╝      ██╔═══╝ ██║   ██║██║     ██╔══██║   ██║   
-   ██║   ╚██████╔╝███████║╚██████╔╝██║         ██║     ╚██████╔╝███████╗██║  ██║   ██║   
-   ╚═╝    ╚═════╝ ╚══════╝ ╚═════╝ ╚═╝         ╚═╝      ╚═════╝ ╚══════╝╚═╝  ╚═╝   ╚═╝   
-""")
-
-
+import argparse
+import asyncio
+import bisect
+import hashlib
+import heapq
+import html as html_entities
+import itertools
+import json
+import mmap
+import os
 import random
+import re
+import socket
+import sqlite3
+import ssl
+import struct
+import sys
+import tempfile
+import threading
 import time
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import asynccontextmanager, contextmanager
 from enum import Enum
-from typing import List, Optional, Dict, Tuple
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional, Dict, Tuple, Union
+from types import SimpleNamespace
+from urllib.parse import urlparse
 
 import requests
-from lxml import html
+from lxml import etree, html
 from requests.exceptions import RequestException
 
+try:
+    import aiohttp
+except ImportError:  # Optional, only needed by AsyncFreeProxy
+    aiohttp = None
+
+try:
+    from aiohttp_socks import ProxyConnector, ProxyError as SocksProxyError
+except ImportError:  # Optional, only needed for SOCKS with AsyncFreeProxy
+    ProxyConnector = SocksProxyError = None
+
+_BANNER = """
+██╗   ██╗██╗   ██╗███████╗██╗   ██╗███████╗    ██████╗  ██████╗ ██╗      █████╗ ████████╗
+╚██╗ ██╔╝██║   ██║██╔════╝██║   ██║██╔════╝    ██╔══██╗██╔═══██╗██║     ██╔══██╗╚══██╔══╝
+ ╚████╔╝ ██║   ██║███████╗██║   ██║█████╗      ██████╔╝██║   ██║██║     ███████║   ██║   
+  ╚██╔╝  ██║   ██║╚════██║██║   ██║██╔══╝      ██╔═══╝ ██║   ██║██║     ██╔══██║   ██║   
+   ██║   ╚██████╔╝███████║╚██████╔╝██║         ██║     ╚██████╔╝███████╗██║  ██║   ██║   
+   ╚═╝    ╚═════╝ ╚══════╝ ╚═════╝ ╚═╝         ╚═╝      ╚═════╝ ╚══════╝╚═╝  ╚═╝   ╚═╝   
+"""
+
 class ProxyException(Exception):
     pass
 
@@ -31,23 +67,1414 @@ class Protocol(Enum):
     SOCKS4 = 'socks4'
     SOCKS5 = 'socks5'
 
-class FreeProxy:
+_REGIONS = {
+    code: region
+    for region, codes in {
+        'North America': ['US', 'CA', 'MX'],
+        'Europe': ['GB', 'DE', 'FR', 'IT', 'ES'],
+        'Asia': ['CN', 'JP', 'KR', 'IN'],
+        'South America': ['BR', 'AR', 'CL']
+    }.items()
+    for code in codes
+}
+
+_ANONYMITY_NAMES = {
+    ProxyAnonymity.TRANSPARENT: 'transparent',
+    ProxyAnonymity.ANONYMOUS: 'anonymous',
+    ProxyAnonymity.ELITE: 'elite proxy'
+}
+
+_ROWS_XPATH = etree.XPath('//div[contains(@class, "fpl-list")]/table/tbody/tr')
+_CELLS_XPATH = etree.XPath('./td')
+
+_FPL_TABLE = re.compile(
+    r'<div[^>]*class\s*=\s*["\'][^"\']*\bfpl-list\b[^"\']*["\'][^>]*>\s*<table[^>]*>(.*?)</table>',
+    re.S
+)
+_TAG = re.compile(r'<[^>]*>')
+
+def _fast_table_rows(content: bytes) -> Optional[List[List[str]]]:
     """
-    Advanced free proxy scraper and validator with support for multiple sources,
-    protocols, and advanced filtering options.
-    
-    Features:
-    - 6 different proxy sources
-    - HTTP/HTTPS/SOCKS support
-    - Country/Region filtering
-    - Anonymity levels
-    - Google compatibility check
-    - Speed/Timeout control
-    - Proxy rotation
-    - Connection validation
-    - Custom test URLs
+    String-splitting extractor for the fpl-list table layout.
+
+    Returns the stripped cell text of every body row, or None when the page
+    doesn't look exactly like the expected layout so the caller can fall back
+    to the lxml DOM path.
     """
-    
+    text = content.decode('utf-8', errors='replace')
+    rows = []
+    for table in _FPL_TABLE.finditer(text):
+        markup = table.group(1)
+        body_start = markup.find('<tbody')
+        body_end = markup.find('</tbody>')
+        if body_start < 0 or body_end < 0 or markup.count('<tbody') != 1:
+            return None
+        body = markup[markup.index('>', body_start) + 1:body_end]
+        if '<table' in body:
+            return None
+
+        for row in body.split('</tr>'):
+            pieces = row.split('</td>')
+            # An unclosed <td> (valid HTML) leaves two openings in a piece, or one after the last </td>
+            if '<td' in pieces.pop():
+                return None
+            if not pieces:
+                continue
+            if len(pieces) < 8:
+                return None
+
+            cells = []
+            for piece in pieces:
+                opening = piece.find('<td')
+                if opening < 0 or piece.count('<td') != 1:
+                    return None
+                cell = piece[piece.index('>', opening) + 1:]
+                if '<' in cell:
+                    cell = _TAG.sub('', cell)
+                if '&' in cell:
+                    cell = html_entities.unescape(cell)
+                cells.append(cell.strip())
+            rows.append(cells)
+    return rows or None
+
+_AGE_UNITS = {'sec': 1, 'min': 60, 'hour': 3600, 'day': 86400}
+_AGE_PATTERN = re.compile(r'(\d+)\s*(sec|min|hour|day)')
+
+@lru_cache(maxsize=256)
+def _parse_anonymity(value: str) -> ProxyAnonymity:
+    value = value.lower()
+    if 'elite' in value or 'high' in value:
+        return ProxyAnonymity.ELITE
+    if 'anonymous' in value:
+        return ProxyAnonymity.ANONYMOUS
+    return ProxyAnonymity.TRANSPARENT
+
+@lru_cache(maxsize=1024)
+def _parse_age(value: str) -> Optional[int]:
+    matches = _AGE_PATTERN.findall(value)
+    if not matches:
+        return None
+    return sum(int(amount) * _AGE_UNITS[unit] for amount, unit in matches)
+
+def _parse_last_checked(value: str, now: Optional[float] = None) -> Optional[float]:
+    """Turn '1 hour 5 mins ago' into a Unix timestamp"""
+    age = _parse_age(value)
+    if age is None:
+        return None
+    return (now or time.time()) - age
+
+def _format_last_checked(timestamp: Optional[float]) -> str:
+    if timestamp is None:
+        return ''
+    age = max(0, int(time.time() - timestamp))
+    for unit, seconds in (('hour', 3600), ('min', 60)):
+        if age >= seconds:
+            count = age // seconds
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return f"{age} secs ago"
+
+class Proxy(Mapping):
+    """
+    A scraped proxy with pre-normalized fields.
+
+    Equality and hashing use (ip, port). Item access (proxy['port'],
+    dict(proxy)) returns the string values of the old per-row dicts, so
+    existing callers keep working.
+    """
+
+    __slots__ = (
+        'ip', 'port', 'code', 'country', 'region', 'protocol',
+        'anonymity', 'https', 'google', 'last_checked',
+        'connect_time', 'ttfb', 'total_time', 'phases', 'failure'
+    )
+
+    _KEYS = ('ip', 'port', 'code', 'country', 'anonymity', 'google', 'https', 'last_checked', 'protocol', 'region')
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        code: str = '',
+        country: str = '',
+        protocol: Protocol = Protocol.HTTP,
+        anonymity: ProxyAnonymity = ProxyAnonymity.TRANSPARENT,
+        https: bool = False,
+        google: bool = False,
+        last_checked: Optional[float] = None,
+        region: Optional[str] = None
+    ):
+        self.ip = ip
+        self.port = int(port)
+        self.code = code
+        self.country = country
+        self.region = region or _REGIONS.get(code, 'Other')
+        self.protocol = protocol
+        self.anonymity = anonymity
+        self.https = https
+        self.google = google
+        self.last_checked = last_checked
+        # Filled in by validation, in seconds
+        self.connect_time = None
+        self.ttfb = None
+        self.total_time = None
+        # Per-phase seconds and failure reason of the last validation
+        self.phases = None
+        self.failure = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Proxy':
+        """Build a Proxy from a legacy row dict"""
+        last_checked = data.get('last_checked')
+        if isinstance(last_checked, str):
+            last_checked = _parse_last_checked(last_checked)
+        return cls(
+            ip=data['ip'],
+            port=data['port'],
+            code=data.get('code', ''),
+            country=data.get('country', ''),
+            protocol=Protocol(str(data.get('protocol', 'http')).lower()),
+            anonymity=_parse_anonymity(data.get('anonymity', '')),
+            https=str(data.get('https', '')).lower() in ('yes', 'true'),
+            google=str(data.get('google', '')).lower() in ('yes', 'true'),
+            last_checked=last_checked
+        )
+
+    def to_row(self) -> list:
+        """Compact JSON-friendly form, the inverse of from_row"""
+        return [
+            self.ip, self.port, self.code, self.country, self.protocol.value,
+            self.anonymity.value, self.https, self.google, self.last_checked
+        ]
+
+    @classmethod
+    def from_row(cls, row: list) -> 'Proxy':
+        ip, port, code, country, protocol, anonymity, https, google, last_checked = row
+        return cls(ip, port, code, country, Protocol(protocol), ProxyAnonymity(anonymity), https, google, last_checked)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {key: self[key] for key in self._KEYS}
+
+    def copy(self) -> 'Proxy':
+        """
+        Independent copy of the record. Validation fills in timings on a copy
+        so scraped records, which are cached and shared, never change.
+        """
+        clone = Proxy.__new__(Proxy)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+    def merge(self, other: 'Proxy'):
+        """Fold another listing of the same ip:port into this one"""
+        if other.last_checked is not None and (self.last_checked is None or other.last_checked > self.last_checked):
+            self.last_checked = other.last_checked
+        self.https = self.https or other.https
+        self.google = self.google or other.google
+        if self.protocol == Protocol.HTTP and other.protocol == Protocol.HTTPS:
+            self.protocol = Protocol.HTTPS
+
+    @property
+    def address(self) -> str:
+        return f"{self.ip}:{self.port}"
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Total time of the last successful validation request"""
+        return self.total_time
+
+    def _set_timings(self, connect_time: Optional[float], ttfb: Optional[float], total_time: Optional[float]):
+        self.connect_time = connect_time
+        self.ttfb = ttfb
+        self.total_time = total_time
+
+    def __getitem__(self, key: str) -> str:
+        if key == 'port':
+            return str(self.port)
+        if key == 'protocol':
+            return self.protocol.value.upper()
+        if key == 'anonymity':
+            return _ANONYMITY_NAMES[self.anonymity]
+        if key in ('https', 'google'):
+            return 'yes' if getattr(self, key) else 'no'
+        if key == 'last_checked':
+            return _format_last_checked(self.last_checked)
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Proxy):
+            return self.ip == other.ip and self.port == other.port
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.ip, self.port))
+
+    def __repr__(self) -> str:
+        latency = '' if self.total_time is None else f", latency={self.total_time:.3f}s"
+        return (
+            f"Proxy({self.address}, {self.protocol.name}, {self.anonymity.name}, "
+            f"{self.code or '??'}, https={self.https}, google={self.google}{latency})"
+        )
+
+def _latency_key(proxy: Proxy) -> float:
+    return proxy.total_time if proxy.total_time is not None else float('inf')
+
+def _connect_failure(error: BaseException) -> str:
+    """Failure reason for an error raised while connecting to a proxy"""
+    if isinstance(error, (socket.timeout, asyncio.TimeoutError)):
+        return 'connect_timeout'
+    if isinstance(error, ConnectionRefusedError):
+        return 'refused'
+    return 'connection_error'
+
+def _tcp_connect(ip: str, port: int, timeout: float) -> Tuple[Optional[float], Optional[str]]:
+    """Seconds taken to open a TCP connection, or None and the failure reason"""
+    started = time.perf_counter()
+    try:
+        with socket.create_connection((ip, port), timeout=timeout):
+            return time.perf_counter() - started, None
+    except OSError as e:
+        return None, _connect_failure(e)
+
+def _summarize_probes(proxies: Iterable[Proxy]) -> Dict[str, Any]:
+    """Failure counts by reason, and count/mean/max seconds per phase, over validated proxies"""
+    failures = {}
+    totals = {}
+    for proxy in proxies:
+        if proxy.failure is not None:
+            failures[proxy.failure] = failures.get(proxy.failure, 0) + 1
+        for phase, seconds in (proxy.phases or {}).items():
+            count, total, longest = totals.get(phase, (0, 0.0, 0.0))
+            totals[phase] = (count + 1, total + seconds, max(longest, seconds))
+    return {
+        'failures': failures,
+        'phases': {
+            phase: {'count': count, 'mean': total / count, 'max': longest}
+            for phase, (count, total, longest) in totals.items()
+        }
+    }
+
+def _request_failure(error: RequestException) -> str:
+    """Failure reason for an error raised by requests while probing through a proxy"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return 'connect_timeout'
+    if isinstance(error, requests.exceptions.Timeout):
+        return 'read_timeout'
+    if isinstance(error, requests.exceptions.SSLError):
+        return 'tls_error'
+    message = str(error)
+    if isinstance(error, requests.exceptions.ProxyError) and 'Tunnel connection failed' in message:
+        return 'tunnel_rejected'
+    if 'refused' in message.lower():
+        return 'refused'
+    return 'connection_error'
+
+_SOCKS5_GREETING = b'\x05\x01\x00'  # Version 5, one method: no authentication
+
+def _socks4_request(ip: str, port: int) -> bytes:
+    return struct.pack('!BBH', 4, 1, port) + socket.inet_aton(ip) + b'\x00'
+
+def _socks5_request(ip: str, port: int) -> bytes:
+    if ':' in ip:
+        return b'\x05\x01\x00\x04' + socket.inet_pton(socket.AF_INET6, ip) + struct.pack('!H', port)
+    return b'\x05\x01\x00\x01' + socket.inet_aton(ip) + struct.pack('!H', port)
+
+def _socks5_address_length(address_type: int, first: int) -> int:
+    """Bytes left in a SOCKS5 reply after its 4-byte head and the first address byte"""
+    if address_type == 1:
+        return 3 + 2
+    if address_type == 4:
+        return 15 + 2
+    return first + 2  # Domain name: the first byte is its length
+
+def _http_connect_request(host: str, port: int) -> bytes:
+    return f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n".encode('ascii')
+
+def _status_code(head: bytes) -> int:
+    parts = head.split(b'\r\n', 1)[0].split(None, 2)
+    return int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+
+# Failure reasons for a timeout and for any other error, by the probe phase they happen in
+_PHASE_FAILURES = {
+    'tunnel': ('tunnel_timeout', 'tunnel_rejected'),
+    'tls': ('tls_timeout', 'tls_error'),
+    'ttfb': ('read_timeout', 'connection_error')
+}
+
+async def _start_tls(writer: asyncio.StreamWriter, context: ssl.SSLContext, hostname: str):
+    """Upgrade a stream to TLS in place; StreamWriter.start_tls() only exists on Python 3.11+"""
+    if hasattr(writer, 'start_tls'):
+        await writer.start_tls(context, server_hostname=hostname)
+        return
+    protocol = writer.transport.get_protocol()
+    transport = await asyncio.get_running_loop().start_tls(writer.transport, protocol, context, server_hostname=hostname)
+    # What 3.11's start_tls() does: the reader keeps receiving through the same protocol, writes go to the new transport
+    writer._transport = protocol._transport = transport
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed mid-handshake")
+        data += chunk
+    return data
+
+def _recv_until(sock: socket.socket, marker: bytes, limit: int = 65536) -> bytes:
+    data = b''
+    while marker not in data:
+        chunk = sock.recv(4096)
+        if not chunk or len(data) > limit:
+            raise ConnectionError("Connection closed mid-handshake")
+        data += chunk
+    return data
+
+_OCTET = rb'(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)'
+_TEXT_PROXY = re.compile(
+    rb'^[ \t]*(?:([A-Za-z0-9]+)://)?(' + _OCTET + rb'(?:\.' + _OCTET + rb'){3}):(\d{1,5})(?!\d)', re.M
+)
+_SCHEMES = {
+    'http': Protocol.HTTP,
+    'https': Protocol.HTTPS,
+    'socks4': Protocol.SOCKS4,
+    'socks4a': Protocol.SOCKS4,
+    'socks5': Protocol.SOCKS5,
+    'socks5h': Protocol.SOCKS5
+}
+_JSON_LIST_KEYS = ('proxies', 'data', 'results', 'items')
+
+def _parse_text_list(content: bytes, protocol: Protocol = Protocol.HTTP) -> List[Proxy]:
+    """
+    Parse one `ip:port` (or `scheme://ip:port`) per line with a single regex
+    pass over the raw bytes; anything else on a line is ignored.
+    """
+    proxies = []
+    append = proxies.append
+    https = protocol == Protocol.HTTPS
+    for scheme, ip, port in _TEXT_PROXY.findall(content):
+        port = int(port)
+        if not 0 < port <= 65535:
+            continue
+        if scheme:
+            row_protocol = _SCHEMES.get(scheme.decode('ascii').lower(), protocol)
+            append(Proxy(ip.decode('ascii'), port, '', '', row_protocol, https=row_protocol == Protocol.HTTPS))
+        else:
+            append(Proxy(ip.decode('ascii'), port, '', '', protocol, https=https))
+    return proxies
+
+def _json_proxy(item: Any, protocol: Protocol) -> Optional[Proxy]:
+    if isinstance(item, str):
+        found = _parse_text_list(item.encode('ascii', 'ignore'), protocol)
+        return found[0] if found else None
+    if not isinstance(item, dict):
+        return None
+
+    ip = item.get('ip') or item.get('host') or item.get('address')
+    port = item.get('port')
+    if not ip:
+        return None
+    if port is None:
+        ip, _, port = str(ip).rpartition(':')
+
+    kind = item.get('protocol') or item.get('type') or item.get('protocols')
+    if isinstance(kind, list):
+        kind = kind[0] if kind else None
+    row_protocol = _SCHEMES.get(str(kind).lower(), protocol) if kind else protocol
+    https = item.get('https')
+    last_checked = item.get('last_checked')
+    return Proxy(
+        str(ip), int(port),
+        str(item.get('code') or item.get('country_code') or '').upper(),
+        str(item.get('country') or ''),
+        row_protocol,
+        _parse_anonymity(str(item.get('anonymity') or item.get('anonymity_level') or '')),
+        row_protocol == Protocol.HTTPS if https is None else str(https).lower() in ('yes', 'true', '1'),
+        str(item.get('google', '')).lower() in ('yes', 'true', '1'),
+        last_checked if isinstance(last_checked, (int, float)) else None
+    )
+
+def _as_proxy(item: Union[Proxy, str, Dict[str, Any]], protocol: Protocol) -> Optional[Proxy]:
+    """Accept a Proxy, an `ip:port` string or a proxy dict; None if it does not describe one"""
+    if isinstance(item, Proxy):
+        return item.copy()
+    if isinstance(item, (str, dict)):
+        try:
+            return _json_proxy(item, protocol)
+        except ValueError:  # e.g. a non-numeric port
+            return None
+    raise TypeError(f"Expected a Proxy, an 'ip:port' string or a dict, got {type(item).__name__}")
+
+def _parse_json_list(content: bytes, protocol: Protocol = Protocol.HTTP) -> List[Proxy]:
+    """
+    Parse a JSON array of proxy objects or `ip:port` strings, either at the
+    top level or under one of the usual keys ('proxies', 'data', ...).
+    """
+    data = json.loads(content)
+    if isinstance(data, dict):
+        data = next((data[key] for key in _JSON_LIST_KEYS if isinstance(data.get(key), list)), [])
+    if not isinstance(data, list):  # null, a number, a string...
+        return []
+
+    proxies = []
+    for item in data:
+        try:
+            proxy = _json_proxy(item, protocol)
+        except (TypeError, ValueError):
+            continue
+        if proxy is not None:
+            proxies.append(proxy)
+    return proxies
+
+class ProxySource:
+    """
+    A proxy list to scrape: where to fetch it and how to parse it.
+
+    format is 'html' (the fpl-list table layout of the built-in sources),
+    'text' (one ip:port per line) or 'json'; pass `parser`, a callable from
+    the raw page bytes to an iterable of Proxy, for anything else. protocol
+    is assumed for rows that do not state their own.
+    """
+
+    FORMATS = ('html', 'text', 'json')
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        format: str = 'html',
+        parser: Optional[Any] = None,
+        protocol: Protocol = Protocol.HTTP
+    ):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown source format {format!r}, expected one of {self.FORMATS}")
+        self.name = name
+        self.url = url
+        self.format = format
+        self.parser = parser
+        self.protocol = protocol
+
+    def key(self) -> Tuple:
+        return (self.name, self.url, self.format, self.parser, self.protocol)
+
+    def __repr__(self) -> str:
+        return f"ProxySource({self.name!r}, {self.url!r}, format={self.format!r})"
+
+def _snapshot_json(proxy: Proxy) -> Dict[str, Any]:
+    return {
+        'ip': proxy.ip,
+        'port': proxy.port,
+        'code': proxy.code,
+        'country': proxy.country,
+        'protocol': proxy.protocol.value,
+        'anonymity': _ANONYMITY_NAMES[proxy.anonymity],
+        'https': proxy.https,
+        'google': proxy.google,
+        'last_checked': proxy.last_checked,
+        'connect_time': proxy.connect_time,
+        'ttfb': proxy.ttfb,
+        'total_time': proxy.total_time
+    }
+
+def _snapshot_proxy(data: Dict[str, Any]) -> Proxy:
+    proxy = _json_proxy(data, Protocol.HTTP)
+    proxy._set_timings(data.get('connect_time'), data.get('ttfb'), data.get('total_time'))
+    return proxy
+
+_SNAPSHOT_MAGIC = b'FPSNAP\x00\x01'
+# magic, record count, countries offset, index offset
+_SNAPSHOT_HEADER = struct.Struct('!8sQQQ')
+# ip (16 bytes, IPv4-mapped for IPv4), port, code, country number, protocol, anonymity,
+# https | google << 1, last_checked, then float32 connect_time, ttfb, total_time; NaN stands for None.
+# Network byte order makes the first 18 bytes a key that sorts like (ip, port).
+_SNAPSHOT_RECORD = struct.Struct('!16sH2sHBBBdfff')
+_SNAPSHOT_KEY_SIZE = 18
+_IPV4_PREFIX = b'\x00' * 10 + b'\xff\xff'
+_PROTOCOL_CODES = list(Protocol)
+_PROTOCOL_NUMBERS = {protocol: number for number, protocol in enumerate(_PROTOCOL_CODES)}
+_ANONYMITY_NUMBERS = {level: level.value for level in ProxyAnonymity}
+_NAN = float('nan')
+
+def _pack_ip(ip: str) -> bytes:
+    try:
+        if ':' in ip:
+            return socket.inet_pton(socket.AF_INET6, ip)
+        return _IPV4_PREFIX + socket.inet_pton(socket.AF_INET, ip)
+    except OSError:
+        raise ValueError(f"Binary snapshots only hold IP addresses, got {ip!r}; use format='jsonl' for host names") from None
+
+def _unpack_ip(packed: bytes) -> str:
+    if packed.startswith(_IPV4_PREFIX):
+        return socket.inet_ntoa(packed[12:])
+    return socket.inet_ntop(socket.AF_INET6, packed)
+
+def _optional(value: float) -> Optional[float]:
+    return None if value != value else value
+
+def _write_binary_snapshot(f, proxies: Iterable[Proxy]) -> int:
+    """Fixed-width records in the given order, then the country names, then an (ip, port)-sorted index"""
+    f.write(b'\x00' * _SNAPSHOT_HEADER.size)
+    countries = {}
+    keys = []
+    pack = _SNAPSHOT_RECORD.pack
+    write = f.write
+    for proxy in proxies:
+        country = countries.get(proxy.country)
+        if country is None:
+            country = countries[proxy.country] = len(countries)
+        record = pack(
+            _pack_ip(proxy.ip), proxy.port, proxy.code.encode('ascii', 'replace')[:2], country,
+            _PROTOCOL_NUMBERS[proxy.protocol], _ANONYMITY_NUMBERS[proxy.anonymity], proxy.https | proxy.google << 1,
+            _NAN if proxy.last_checked is None else proxy.last_checked,
+            _NAN if proxy.connect_time is None else proxy.connect_time,
+            _NAN if proxy.ttfb is None else proxy.ttfb,
+            _NAN if proxy.total_time is None else proxy.total_time
+        )
+        keys.append(record[:_SNAPSHOT_KEY_SIZE])
+        write(record)
+
+    countries_offset = f.tell()
+    names = json.dumps(list(countries)).encode('utf-8')
+    f.write(struct.pack('!I', len(names)) + names)
+    index_offset = f.tell()
+    f.write(struct.pack(f'!{len(keys)}I', *sorted(range(len(keys)), key=keys.__getitem__)))
+    f.seek(0)
+    f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, len(keys), countries_offset, index_offset))
+    return len(keys)
+
+def _read_jsonl_snapshot(path: str) -> Iterator[Proxy]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield _snapshot_proxy(json.loads(line))
+
+class ProxySnapshot:
+    """
+    Read-only, memory-mapped view of a binary snapshot written by
+    FreeProxy.save_snapshot(format='binary').
+
+    Opening only reads the header and the country names; entries are decoded
+    on access, and lookup() binary-searches an (ip, port) index stored in the
+    file, so neither needs a pass over the whole snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self._file.close()
+            raise ProxyException(f"{path} is not a proxy snapshot")
+
+        magic, self._count, countries_offset, self._index_offset = _SNAPSHOT_HEADER.unpack_from(self._map)
+        if magic != _SNAPSHOT_MAGIC:
+            self.close()
+            raise ProxyException(f"{path} is not a proxy snapshot")
+        size, = struct.unpack_from('!I', self._map, countries_offset)
+        self._countries = json.loads(self._map[countries_offset + 4:countries_offset + 4 + size].decode('utf-8'))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, number: int) -> Proxy:
+        if number < 0:
+            number += self._count
+        if not 0 <= number < self._count:
+            raise IndexError(number)
+        ip, port, code, country, protocol, anonymity, flags, last_checked, connect_time, ttfb, total_time = \
+            _SNAPSHOT_RECORD.unpack_from(self._map, _SNAPSHOT_HEADER.size + number * _SNAPSHOT_RECORD.size)
+        proxy = Proxy(
+            _unpack_ip(ip), port, code.rstrip(b'\x00').decode('ascii'), self._countries[country],
+            _PROTOCOL_CODES[protocol], ProxyAnonymity(anonymity), bool(flags & 1), bool(flags & 2),
+            _optional(last_checked)
+        )
+        proxy._set_timings(_optional(connect_time), _optional(ttfb), _optional(total_time))
+        return proxy
+
+    def __iter__(self) -> Iterator[Proxy]:
+        for number in range(self._count):
+            yield self[number]
+
+    def lookup(self, ip: str, port: int) -> Optional[Proxy]:
+        """Find the entry for ip:port, or None"""
+        key = _pack_ip(ip) + struct.pack('!H', int(port))
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            number, = struct.unpack_from('!I', self._map, self._index_offset + middle * 4)
+            offset = _SNAPSHOT_HEADER.size + number * _SNAPSHOT_RECORD.size
+            found = self._map[offset:offset + _SNAPSHOT_KEY_SIZE]
+            if found == key:
+                return self[number]
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def __contains__(self, proxy: Proxy) -> bool:
+        return self.lookup(proxy.ip, proxy.port) is not None
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class ProxyPool:
+    """
+    Proxy collection with secondary indexes for fast multi-attribute queries.
+
+    Every indexed attribute (code, region, protocol, anonymity, https, google)
+    maps each value to the set of matching entries, so query() only touches
+    the smallest matching index rather than scanning the whole pool.
+    """
+
+    INDEXED = ('code', 'region', 'protocol', 'anonymity', 'https', 'google')
+
+    def __init__(self, proxies: Iterable[Proxy] = ()):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._ids = {}
+        self._next_id = 0
+        self._indexes = {field: {} for field in self.INDEXED}
+        self.update(proxies)
+
+    def add(self, proxy: Proxy):
+        """Add a proxy, replacing any entry with the same ip:port"""
+        with self._lock:
+            self.discard(proxy)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = proxy
+            self._ids[proxy] = entry_id
+            for field, index in self._indexes.items():
+                index.setdefault(getattr(proxy, field), set()).add(entry_id)
+
+    def update(self, proxies: Iterable[Proxy]):
+        with self._lock:
+            for proxy in proxies:
+                self.add(proxy)
+
+    def discard(self, proxy: Proxy):
+        with self._lock:
+            entry_id = self._ids.pop(proxy, None)
+            if entry_id is None:
+                return
+            stored = self._entries.pop(entry_id)
+            for field, index in self._indexes.items():
+                value = getattr(stored, field)
+                ids = index[value]
+                ids.discard(entry_id)
+                if not ids:
+                    del index[value]
+
+    def query(
+        self,
+        countries: Optional[Iterable[str]] = None,
+        regions: Optional[Iterable[str]] = None,
+        protocol: Optional[Union[Protocol, Iterable[Protocol]]] = None,
+        anonymity: Optional[Union[ProxyAnonymity, Iterable[ProxyAnonymity]]] = None,
+        https: Optional[bool] = None,
+        google: Optional[bool] = None,
+        limit: Optional[int] = None
+    ) -> List[Proxy]:
+        """Return proxies matching every given filter, oldest entries first"""
+        constraints = [
+            ('code', countries),
+            ('region', regions),
+            ('protocol', [protocol] if isinstance(protocol, Protocol) else protocol),
+            ('anonymity', [anonymity] if isinstance(anonymity, ProxyAnonymity) else anonymity),
+            ('https', None if https is None else [https]),
+            ('google', None if google is None else [google])
+        ]
+
+        with self._lock:
+            candidates = []
+            for field, values in constraints:
+                if values is None:
+                    continue
+                index = self._indexes[field]
+                matched = [index[value] for value in values if value in index]
+                if not matched:
+                    return []
+                candidates.append(matched[0] if len(matched) == 1 else set().union(*matched))
+
+            if not candidates:
+                ids = self._entries.keys()
+            else:
+                candidates.sort(key=len)
+                ids = candidates[0].intersection(*candidates[1:])
+
+            if limit is None:
+                ids = sorted(ids)
+            else:
+                ids = heapq.nsmallest(limit, ids)
+            return [self._entries[entry_id] for entry_id in ids]
+
+    def __contains__(self, proxy) -> bool:
+        return proxy in self._ids
+
+    def __iter__(self) -> Iterator[Proxy]:
+        with self._lock:
+            return iter(list(self._entries.values()))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class _ProxyStats:
+    __slots__ = ('successes', 'failures', 'latency')
+
+    def __init__(self, latency: Optional[float] = None):
+        self.successes = 0
+        self.failures = 0
+        self.latency = latency
+
+    @property
+    def weight(self) -> float:
+        # Smoothed success rate per second of latency
+        success_rate = (self.successes + 1) / (self.successes + self.failures + 2)
+        return success_rate / max(self.latency or 1.0, 0.01)
+
+class RotatingProxyPool:
+    """
+    Thread-safe rotation over a set of working proxies.
+
+    Policies:
+    - round_robin: each proxy in turn (lock-free atomic counter)
+    - lru: the least recently handed out proxy
+    - weighted: random, weighted by success rate and latency (alias table)
+
+    Selection is O(1) for every policy. report_success/report_failure only
+    update per-proxy counters without locking; the weighted policy picks up
+    the new weights when its alias table is rebuilt, at most once every
+    refresh_interval seconds and by a single thread. add() and discard()
+    take effect on the next selection.
+    """
+
+    POLICIES = ('round_robin', 'lru', 'weighted')
+
+    def __init__(self, proxies: Iterable[Proxy] = (), policy: str = 'round_robin', refresh_interval: float = 1.0):
+        self._check_policy(policy)
+        self.policy = policy
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._stats = {}
+        self._members = ()
+        self._lru = OrderedDict()
+        self._counter = itertools.count()
+        self._alias = ((), (), ())
+        self._alias_built = 0.0
+        self._dirty = True
+        for proxy in proxies:
+            self.add(proxy)
+
+    def _check_policy(self, policy: str):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {', '.join(self.POLICIES)}")
+
+    def add(self, proxy: Proxy):
+        with self._lock:
+            if proxy in self._stats:
+                return
+            self._stats[proxy] = _ProxyStats(proxy.total_time)
+            self._members = self._members + (proxy,)
+            self._lru[proxy] = None
+            self._dirty = True
+
+    def discard(self, proxy: Proxy):
+        with self._lock:
+            if self._stats.pop(proxy, None) is None:
+                return
+            self._members = tuple(member for member in self._members if member != proxy)
+            self._lru.pop(proxy, None)
+            self._dirty = True
+
+    def select(self, policy: Optional[str] = None) -> Proxy:
+        """Hand out the next proxy according to `policy` (default: the pool's policy)"""
+        policy = policy or self.policy
+        self._check_policy(policy)
+
+        if policy == 'round_robin':
+            members = self._members
+            if not members:
+                raise ProxyException("Proxy pool is empty")
+            return members[next(self._counter) % len(members)]
+        if policy == 'lru':
+            with self._lock:
+                if not self._lru:
+                    raise ProxyException("Proxy pool is empty")
+                proxy = next(iter(self._lru))
+                self._lru.move_to_end(proxy)
+            return proxy
+        return self._select_weighted()
+
+    def _select_weighted(self) -> Proxy:
+        if self._alias[0] is not self._members:
+            # add()/discard() replace _members, so a table over another tuple is stale: rebuild now
+            with self._rebuild_lock:
+                if self._alias[0] is not self._members:
+                    self._rebuild_alias()
+        elif self._dirty and time.monotonic() - self._alias_built >= self.refresh_interval:
+            # Weight changes are rate-limited: only one thread rebuilds, the others keep using the current table
+            if self._rebuild_lock.acquire(blocking=False):
+                try:
+                    self._rebuild_alias()
+                finally:
+                    self._rebuild_lock.release()
+
+        members, probabilities, aliases = self._alias
+        if not members:
+            raise ProxyException("Proxy pool is empty")
+
+        i = random.randrange(len(members))
+        return members[i] if random.random() < probabilities[i] else members[aliases[i]]
+
+    def _rebuild_alias(self):
+        """Vose's alias method: O(n) to build, O(1) per weighted draw"""
+        self._dirty = False
+        self._alias_built = time.monotonic()
+        members = self._members
+        stats = self._stats
+        weights = [stats[proxy].weight if proxy in stats else 0.0 for proxy in members]
+        total = sum(weights)
+        count = len(members)
+        if not count or total <= 0:
+            self._alias = (members, (1.0,) * count, tuple(range(count)))
+            return
+
+        scaled = [weight * count / total for weight in weights]
+        probabilities = [1.0] * count
+        aliases = list(range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            probabilities[low] = scaled[low]
+            aliases[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        self._alias = (members, tuple(probabilities), tuple(aliases))
+
+    def report_success(self, proxy: Proxy, latency: Optional[float] = None):
+        stats = self._stats.get(proxy)
+        if stats is None:
+            return
+        stats.successes += 1
+        if latency is not None:
+            stats.latency = latency if stats.latency is None else 0.8 * stats.latency + 0.2 * latency
+        self._dirty = True
+
+    def report_failure(self, proxy: Proxy):
+        stats = self._stats.get(proxy)
+        if stats is None:
+            return
+        stats.failures += 1
+        self._dirty = True
+
+    def stats(self, proxy: Proxy) -> Optional[Dict[str, Any]]:
+        stats = self._stats.get(proxy)
+        if stats is None:
+            return None
+        return {
+            'successes': stats.successes,
+            'failures': stats.failures,
+            'latency': stats.latency,
+            'weight': stats.weight
+        }
+
+    def __contains__(self, proxy) -> bool:
+        return proxy in self._stats
+
+    def __iter__(self) -> Iterator[Proxy]:
+        return iter(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+class _HostThrottle:
+    """Per-host politeness: caps concurrent requests and spaces out request starts"""
+
+    def __init__(self, max_connections: int = 2, delay: float = 0.25):
+        self.max_connections = max_connections
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._next_start = {}
+
+    @contextmanager
+    def slot(self, url: str):
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._slots.get(host)
+            if semaphore is None:
+                semaphore = self._slots[host] = threading.BoundedSemaphore(self.max_connections)
+            start = max(time.monotonic(), self._next_start.get(host, 0.0))
+            self._next_start[host] = start + self.delay
+
+        wait = start - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        with semaphore:
+            yield
+
+class _AsyncHostThrottle:
+    """asyncio counterpart of _HostThrottle"""
+
+    def __init__(self, max_connections: int = 2, delay: float = 0.25):
+        self.max_connections = max_connections
+        self.delay = delay
+        self._slots = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlparse(url).netloc
+        semaphore = self._slots.get(host)
+        if semaphore is None:
+            semaphore = self._slots[host] = asyncio.Semaphore(self.max_connections)
+        start = max(time.monotonic(), self._next_start.get(host, 0.0))
+        self._next_start[host] = start + self.delay
+
+        wait = start - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        async with semaphore:
+            yield
+
+class ProxyCache:
+    """
+    Persistent SQLite cache of parsed source pages.
+
+    Entries younger than their TTL are served without any network I/O; older
+    entries are kept as a fallback for when a source cannot be fetched. The
+    database runs in WAL mode so several processes can read it while one writes.
+    """
+
+    def __init__(self, path: str, ttl: float = 600.0, source_ttls: Optional[Dict[str, float]] = None):
+        self.path = path
+        self.ttl = ttl
+        self.source_ttls = source_ttls or {}
+        self._local = threading.local()
+
+        connection = self._connect()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS sources ('
+            'name TEXT PRIMARY KEY, fetched_at REAL NOT NULL, proxies TEXT NOT NULL)'
+        )
+        connection.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, timeout=30.0)
+        return connection
+
+    def get(self, source_name: str, allow_stale: bool = False) -> Optional[List[Proxy]]:
+        """Return the cached proxies for a source, or None if missing or expired"""
+        row = self._connect().execute(
+            'SELECT fetched_at, proxies FROM sources WHERE name = ?', (source_name,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        fetched_at, proxies = row
+        if not allow_stale and time.time() - fetched_at > self.source_ttls.get(source_name, self.ttl):
+            return None
+        return [
+            Proxy.from_dict(entry) if isinstance(entry, dict) else Proxy.from_row(entry)
+            for entry in json.loads(proxies)
+        ]
+
+    def put(self, source_name: str, proxies: List[Proxy]):
+        connection = self._connect()
+        connection.execute(
+            'INSERT OR REPLACE INTO sources (name, fetched_at, proxies) VALUES (?, ?, ?)',
+            (source_name, time.time(), json.dumps([proxy.to_row() for proxy in proxies]))
+        )
+        connection.commit()
+
+    def clear(self):
+        connection = self._connect()
+        connection.execute('DELETE FROM sources')
+        connection.commit()
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+@contextmanager
+def _atomic_open(path: str, mode: str = 'w'):
+    """
+    Open a uniquely named temp file next to `path` and move it into place
+    on success, so concurrent writers never share a temp file and a failed
+    write leaves nothing behind.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + '.')
+    try:
+        # mkstemp creates 0600; keep the permissions of the file being replaced, or the usual 0644
+        try:
+            file_mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            file_mode = 0o644
+        os.chmod(tmp_path, file_mode)
+        with open(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class ProxyHealth:
+    """
+    Validation history per ip:port with exponential backoff for failures.
+
+    After n consecutive failures a proxy is not eligible again for
+    base_backoff * 2 ** (n - 1) seconds (capped at max_backoff). Candidates in
+    their backoff window are tested last, or dropped when skip is True.
+    Pass a path to keep the history across runs.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        base_backoff: float = 30.0,
+        max_backoff: float = 3600.0,
+        skip: bool = False
+    ):
+        self.path = path
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.skip = skip
+        self._lock = threading.Lock()
+        self._records = {}
+
+        if path and os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def _key(proxy: Proxy) -> str:
+        return proxy.address
+
+    def get(self, proxy: Proxy) -> Optional[Dict]:
+        """Return the history record for a proxy, if it was ever tested"""
+        return self._records.get(self._key(proxy))
+
+    def record(self, proxy: Proxy, success: bool):
+        now = time.time()
+        with self._lock:
+            entry = self._records.setdefault(self._key(proxy), {
+                'last_success': None,
+                'last_failure': None,
+                'failures': 0,
+                'next_eligible': 0.0
+            })
+            if success:
+                entry['last_success'] = now
+                entry['failures'] = 0
+                entry['next_eligible'] = 0.0
+            else:
+                entry['last_failure'] = now
+                entry['failures'] += 1
+                # Past 32 doublings the cap has long been reached; the float power would overflow eventually
+                backoff = self.base_backoff * 2 ** min(entry['failures'] - 1, 32)
+                entry['next_eligible'] = now + min(backoff, self.max_backoff)
+
+    def is_eligible(self, proxy: Proxy, now: Optional[float] = None) -> bool:
+        entry = self._records.get(self._key(proxy))
+        return entry is None or entry['next_eligible'] <= (now or time.time())
+
+    def prioritize(self, proxies: List[Proxy]) -> List[Proxy]:
+        """Order candidates eligible-first, keeping their relative order"""
+        now = time.time()
+        eligible, backing_off = [], []
+        for proxy in proxies:
+            (eligible if self.is_eligible(proxy, now) else backing_off).append(proxy)
+
+        if self.skip:
+            return eligible
+        backing_off.sort(key=lambda proxy: self._records[self._key(proxy)]['next_eligible'])
+        return eligible + backing_off
+
+    def load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        with self._lock:
+            self._records.update(records)
+
+    def save(self):
+        """Write the history to `path` atomically; a no-op for in-memory instances"""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._records)
+        with _atomic_open(self.path) as f:
+            f.write(data)
+
+class _ScrapeCache:
+    """
+    Process-wide cache of raw (unfiltered) scrape results.
+
+    A cold key is scraped once while concurrent callers wait for it. Once an
+    entry is older than its TTL the stale list keeps being served while a
+    single background thread refreshes it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+
+    def get(self, key: Tuple, ttl: float, scrape) -> List[Proxy]:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                pending = self._inflight.get(key)
+                if entry is not None:
+                    fetched_at, proxies = entry
+                    if pending is None and time.monotonic() - fetched_at > ttl:
+                        self._inflight[key] = threading.Event()
+                        threading.Thread(target=self._refresh, args=(key, scrape), daemon=True).start()
+                    return proxies
+                if pending is None:
+                    self._inflight[key] = threading.Event()
+
+            if pending is None:
+                return self._refresh(key, scrape)
+            pending.wait()
+
+    def _refresh(self, key: Tuple, scrape) -> List[Proxy]:
+        try:
+            proxies = scrape()
+            with self._lock:
+                # Keep serving the old list if every source failed this time
+                if proxies or key not in self._entries:
+                    self._entries[key] = (time.monotonic(), proxies)
+            return proxies
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+_shared_scrapes = _ScrapeCache()
+
+class _Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class ProxyMetrics:
+    """
+    In-process counters and latency histograms for fetching, parsing,
+    filtering and validation. Read them with snapshot(), or export them in
+    the Prometheus text format with to_prometheus(), write_prometheus() or
+    serve().
+    """
+
+    enabled = True
+    BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    HELP = {
+        'freeproxy_fetch_seconds': ('histogram', 'Source download time'),
+        'freeproxy_fetches_total': ('counter', 'Source downloads by outcome'),
+        'freeproxy_fetch_bytes_total': ('counter', 'Decoded bytes downloaded per source'),
+        'freeproxy_parse_seconds': ('histogram', 'Source parse time'),
+        'freeproxy_parsed_rows_total': ('counter', 'Proxy rows parsed per source'),
+        'freeproxy_filter_candidates_total': ('counter', 'Proxies offered to the filters'),
+        'freeproxy_filter_passed_total': ('counter', 'Proxies that passed the filters'),
+        'freeproxy_validation_seconds': ('histogram', 'Validation probe time'),
+        'freeproxy_validation_phase_seconds': ('histogram', 'Validation probe time per phase'),
+        'freeproxy_validations_total': ('counter', 'Validations by outcome'),
+    }
+
+    def __init__(self, buckets: Optional[Iterable[float]] = None):
+        self.buckets = tuple(sorted(buckets)) if buckets is not None else self.BUCKETS
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def _count(self, name: str, labels: Tuple, value: float = 1):
+        series = self._counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + value
+
+    def _observe(self, name: str, labels: Tuple, value: float):
+        series = self._histograms.setdefault(name, {})
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = _Histogram(self.buckets)
+        histogram.observe(value)
+
+    def observe_fetch(self, source: str, seconds: float, size: int, outcome: str):
+        """Record one source download; outcome is 'ok', 'not_modified' or 'error'"""
+        labels = (('source', source),)
+        with self._lock:
+            self._observe('freeproxy_fetch_seconds', labels, seconds)
+            self._count('freeproxy_fetches_total', labels + (('outcome', outcome),))
+            self._count('freeproxy_fetch_bytes_total', labels, size)
+
+    def observe_parse(self, source: str, seconds: float, rows: int):
+        labels = (('source', source),)
+        with self._lock:
+            self._observe('freeproxy_parse_seconds', labels, seconds)
+            self._count('freeproxy_parsed_rows_total', labels, rows)
+
+    def observe_filter(self, candidates: int, passed: int):
+        with self._lock:
+            self._count('freeproxy_filter_candidates_total', (), candidates)
+            self._count('freeproxy_filter_passed_total', (), passed)
+
+    def observe_validation(self, outcome: str, seconds: Optional[float] = None):
+        """Record one validation; seconds is None when the proxy failed before the probe ran"""
+        with self._lock:
+            if seconds is not None:
+                self._observe('freeproxy_validation_seconds', (), seconds)
+            self._count('freeproxy_validations_total', (('outcome', outcome),))
+
+    def observe_phases(self, phases: Dict[str, float]):
+        with self._lock:
+            for phase, seconds in phases.items():
+                self._observe('freeproxy_validation_phase_seconds', (('phase', phase),), seconds)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict copy of every series, plus the overall filter pass rate"""
+        with self._lock:
+            counters = {
+                name: {self._label_text(labels): value for labels, value in series.items()}
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: {
+                    self._label_text(labels): {
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'buckets': dict(zip(self.buckets + (float('inf'),), itertools.accumulate(histogram.counts)))
+                    }
+                    for labels, histogram in series.items()
+                }
+                for name, series in self._histograms.items()
+            }
+        candidates = counters.get('freeproxy_filter_candidates_total', {}).get('', 0)
+        passed = counters.get('freeproxy_filter_passed_total', {}).get('', 0)
+        return {
+            'counters': counters,
+            'histograms': histograms,
+            'filter_pass_rate': passed / candidates if candidates else None
+        }
+
+    @staticmethod
+    def _label_text(labels: Tuple) -> str:
+        return ','.join('%s="%s"' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"')) for key, value in labels)
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        return '+Inf' if value == float('inf') else repr(float(value)) if isinstance(value, float) else str(value)
+
+    def to_prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in self.HELP.items():
+                series = (self._histograms if kind == 'histogram' else self._counters).get(name)
+                if not series:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in series.items():
+                    text = self._label_text(labels)
+                    if kind == 'counter':
+                        lines.append(f"{name}{{{text}}} {self._format_value(value)}" if text else f"{name} {self._format_value(value)}")
+                        continue
+                    prefix = text + ',' if text else ''
+                    for bound, cumulative in zip(self.buckets + (float('inf'),), itertools.accumulate(value.counts)):
+                        lines.append(f'{name}_bucket{{{prefix}le="{self._format_value(bound)}"}} {cumulative}')
+                    suffix = f"{{{text}}}" if text else ''
+                    lines.append(f"{name}_sum{suffix} {value.sum!r}")
+                    lines.append(f"{name}_count{suffix} {value.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Dump to_prometheus() to `path` atomically, e.g. for the node_exporter textfile collector"""
+        with _atomic_open(path) as f:
+            f.write(self.to_prometheus())
+
+    def serve(self, port: int = 9108, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Expose to_prometheus() over HTTP from a daemon thread; call shutdown() on the result to stop it"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='freeproxy-metrics', daemon=True).start()
+        return server
+
+class _NullMetrics(ProxyMetrics):
+    """Stands in when metrics are disabled, so instrumented code needs no checks"""
+
+    enabled = False
+
+    def observe_fetch(self, source: str, seconds: float, size: int, outcome: str):
+        pass
+
+    def observe_parse(self, source: str, seconds: float, rows: int):
+        pass
+
+    def observe_filter(self, candidates: int, passed: int):
+        pass
+
+    def observe_validation(self, outcome: str, seconds: Optional[float] = None):
+        pass
+
+    def observe_phases(self, phases: Dict[str, float]):
+        pass
+
+_NULL_METRICS = _NullMetrics()
+
+class _FreeProxyBase:
+    """Options, parsing and filtering shared by the sync and async clients"""
+
     SOURCES = {
         'sslproxies': 'https://www.sslproxies.org/',
         'us-proxy': 'https://www.us-proxy.org/',
@@ -57,6 +1484,10 @@ class FreeProxy:
         'general': 'https://free-proxy-list.net/'
     }
 
+    PHASE_TIMEOUTS = ('connect', 'tunnel', 'tls', 'ttfb')
+    ENGINES = ('client', 'streams')
+    TARGET_DNS_TTL = 300.0
+
     def __init__(
         self,
         countries: Optional[List[str]] = None,
@@ -69,7 +1500,24 @@ class FreeProxy:
         randomize: bool = True,
         max_proxies: int = 100,
         verify_ssl: bool = False,
-        user_agent: Optional[str] = None
+        user_agent: Optional[str] = None,
+        max_workers: int = 6,
+        max_connections_per_host: int = 2,
+        host_delay: float = 0.25,
+        validation_workers: int = 20,
+        cache: Optional[Union[str, ProxyCache]] = None,
+        shared_cache_ttl: Optional[float] = None,
+        health: Optional[Union[str, ProxyHealth]] = None,
+        fast_parser: bool = True,
+        max_latency: Optional[float] = None,
+        precheck_timeout: Optional[float] = None,
+        precheck_workers: int = 256,
+        refresh_after: float = 60.0,
+        metrics: Optional[Union[bool, ProxyMetrics]] = None,
+        phase_timing: bool = False,
+        phase_timeouts: Optional[Dict[str, float]] = None,
+        sources: Optional[Dict[str, Union[str, ProxySource]]] = None,
+        engine: str = 'client'
     ):
         self.countries = countries or []
         self.regions = regions or []
@@ -82,35 +1530,414 @@ class FreeProxy:
         self.max_proxies = max_proxies
         self.verify_ssl = verify_ssl
         self.user_agent = user_agent or 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        
-        self._session = requests.Session()
-        self._session.headers.update({'User-Agent': self.user_agent})
+        self.max_workers = max_workers
+        self.max_connections_per_host = max_connections_per_host
+        self.host_delay = host_delay
+        self.validation_workers = validation_workers
+        self.cache = ProxyCache(cache) if isinstance(cache, str) else cache
+        self.shared_cache_ttl = shared_cache_ttl
+        self.health = health if isinstance(health, ProxyHealth) else ProxyHealth(health)
+        self.fast_parser = fast_parser
+        self.max_latency = max_latency
+        self.precheck_timeout = precheck_timeout
+        self.precheck_workers = precheck_workers
+        self.refresh_after = refresh_after
+        self.sources = self._resolve_sources(self.SOURCES if sources is None else sources)
+        self.phase_timeouts = dict(phase_timeouts or {})
+        unknown = set(self.phase_timeouts) - set(self.PHASE_TIMEOUTS)
+        if unknown:
+            raise ValueError(f"Unknown phases {sorted(unknown)}, expected some of {self.PHASE_TIMEOUTS}")
+        self.phase_timing = phase_timing or bool(self.phase_timeouts)
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {self.ENGINES}")
+        self.engine = engine
+        self._tls_context = None
+        self._target = None
+        self._target_ips = {}
+        if isinstance(metrics, ProxyMetrics):
+            self.metrics = metrics
+        else:
+            self.metrics = ProxyMetrics() if metrics else _NULL_METRICS
+        self.last_validation_report = {}
+        self.last_scrape_report = {}
+        self._source_state = {}
+        self._candidates = None
+        self._candidates_at = 0.0
+
+    def _probe_timeout(self) -> float:
+        """Proxies slower than max_latency fail anyway, so stop waiting for them early"""
+        if self.max_latency is None:
+            return self.timeout
+        return min(self.timeout, self.max_latency)
+
+    def _phase_timeout(self, phase: str) -> float:
+        return self.phase_timeouts.get(phase, self._probe_timeout())
+
+    def _ssl_context(self) -> ssl.SSLContext:
+        if self._tls_context is None:
+            context = ssl.create_default_context()
+            if not self.verify_ssl:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            self._tls_context = context
+        return self._tls_context
+
+    def _probe_target(self) -> SimpleNamespace:
+        """test_url split up for the raw-socket probes, with both request forms prebuilt"""
+        if self._target is None or self._target.url != self.test_url:
+            target = urlparse(self.test_url)
+            secure = target.scheme == 'https'
+            path = (target.path or '/') + (f"?{target.query}" if target.query else '')
+            headers = f"Host: {target.netloc}\r\nUser-Agent: {self.user_agent}\r\nConnection: close\r\n\r\n"
+            self._target = SimpleNamespace(
+                url=self.test_url,
+                host=target.hostname,
+                port=target.port or (443 if secure else 80),
+                secure=secure,
+                # HTTP/1.0 keeps the body unchunked; plain HTTP through an HTTP proxy takes the absolute URI
+                request=f"GET {path} HTTP/1.0\r\n{headers}".encode('latin-1'),
+                proxy_request=f"GET {self.test_url} HTTP/1.0\r\n{headers}".encode('latin-1')
+            )
+        return self._target
 
-    def get_proxy_list(self) -> List[Dict[str, str]]:
-        """Retrieve and filter proxies from all sources"""
-        proxies = []
-        
-        for source_name, source_url in self.SOURCES.items():
+    def _check_probe_response(self, data: bytes) -> Optional[str]:
+        head, _, body = data.partition(b'\r\n\r\n')
+        # Additional verification for Google compatibility
+        if self.google_compatible:
+            return None if b'google' in body.lower() else 'content_mismatch'
+        return None if _status_code(head) == 200 else 'bad_status'
+
+    def _record_probe(self, proxy: Proxy, failure: Optional[str], started: float) -> bool:
+        """Attach the outcome to the proxy and the metrics; True if it passed"""
+        proxy.failure = failure
+        self.metrics.observe_validation(failure or 'ok', time.perf_counter() - started)
+        if proxy.phases:
+            self.metrics.observe_phases(proxy.phases)
+        return failure is None
+
+    async def _tcp_precheck(self, proxy: Proxy) -> Optional[float]:
+        """Seconds for a bare TCP connect to the proxy, or None once the failure is recorded on it"""
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(proxy.ip, proxy.port), self.precheck_timeout)
+        except (OSError, OverflowError, ValueError, asyncio.TimeoutError) as e:
+            proxy.phases, proxy.failure = None, _connect_failure(e)
+            self.metrics.observe_validation(proxy.failure)
+            return None
+        connect_time = time.perf_counter() - started
+        writer.close()
+        return connect_time
+
+    async def _stream_test(self, proxy: Proxy) -> bool:
+        """Validate a proxy with the asyncio streams engine, recording its timings"""
+        started = time.perf_counter()
+        proxy._set_timings(None, None, None)
+        proxy.phases = None
+        return self._record_probe(proxy, await self._stream_probe(proxy), started)
+
+    def _probe_proxy_url(self, proxy: Proxy) -> str:
+        """
+        Proxy URL for requests/aiohttp. Protocol.HTTPS means a proxy that can
+        CONNECT to https targets (the lists' "Https" column), spoken to in plain
+        HTTP like the raw-socket engines do, not TLS to the proxy itself.
+        """
+        scheme = 'http' if proxy.protocol == Protocol.HTTPS else proxy.protocol.value
+        return f"{scheme}://{proxy.address}"
+
+    def _probe_steps(self, protocol: Protocol, target: SimpleNamespace, target_ip: Optional[str]):
+        """
+        The protocol side of the raw probes, shared by the socket and asyncio
+        streams drivers. A generator yielding I/O steps, each a tuple:
+
+            ('phase', name)       later steps run under this phase's timeout and failure reasons
+            ('lap', name)         record the time since the previous lap as phase `name`
+            ('send', data)
+            ('recv', size)        -> exactly size bytes
+            ('recv_until', marker) -> bytes up to and including marker
+            ('tls', hostname)     wrap the connection in TLS
+            ('response',)         -> the response, up to 1 MiB; laps 'ttfb' at the first byte
+
+        Returns the failure reason from the protocol's point of view, or None.
+        Round trips are kept to a minimum: the SOCKS greeting, connect request
+        and (for plain HTTP targets) the test request go out in one write, and
+        plain HTTP through an HTTP proxy is a single forwarded request.
+        """
+        socks = protocol in (Protocol.SOCKS4, Protocol.SOCKS5)
+        request = target.request if socks or target.secure else target.proxy_request
+
+        if socks:
+            yield ('phase', 'tunnel')
+            if protocol == Protocol.SOCKS5:
+                hello = _SOCKS5_GREETING + _socks5_request(target_ip, target.port)
+            else:
+                hello = _socks4_request(target_ip, target.port)
+            yield ('send', hello if target.secure else hello + request)
+            if protocol == Protocol.SOCKS5:
+                if (yield ('recv', 2)) != b'\x05\x00':
+                    return 'tunnel_rejected'
+                reply = yield ('recv', 5)
+                yield ('recv', _socks5_address_length(reply[3], reply[4]))
+                accepted = reply[1] == 0
+            else:
+                accepted = (yield ('recv', 8))[1] == 0x5a
+            if not accepted:
+                return 'tunnel_rejected'
+            yield ('lap', 'tunnel')
+        elif target.secure:
+            yield ('phase', 'tunnel')
+            yield ('send', _http_connect_request(target.host, target.port))
+            if _status_code((yield ('recv_until', b'\r\n\r\n'))) != 200:
+                return 'tunnel_rejected'
+            yield ('lap', 'tunnel')
+
+        if target.secure:
+            yield ('phase', 'tls')
+            yield ('tls', target.host)
+            yield ('lap', 'tls')
+
+        yield ('phase', 'ttfb')
+        if target.secure or not socks:
+            yield ('send', request)
+        return self._check_probe_response((yield ('response',)))
+
+    def _finish_probe(self, proxy: Proxy, failure: Optional[str], started: float) -> Optional[str]:
+        if failure is not None:
+            return failure
+        total_time = time.perf_counter() - started
+        proxy._set_timings(proxy.phases['connect'], proxy.phases['ttfb'], total_time)
+        return None if self._within_latency(total_time) else 'too_slow'
+
+    async def _stream_probe(self, proxy: Proxy) -> Optional[str]:
+        """Run _probe_steps() over asyncio streams. Returns the failure reason or None."""
+        target = self._probe_target()
+        phases = proxy.phases = {}
+        started = mark = time.perf_counter()
+
+        def lap(phase: str):
+            nonlocal mark
+            now = time.perf_counter()
+            phases[phase] = now - mark
+            mark = now
+
+        target_ip = None
+        if proxy.protocol in (Protocol.SOCKS4, Protocol.SOCKS5):
+            # socks4:// and socks5:// resolve the target locally, as requests does
             try:
-                page = self._session.get(source_url, timeout=self.timeout, verify=self.verify_ssl)
-                page.raise_for_status()
-                proxies += self._parse_source(page.content, source_name)
-                time.sleep(1)  # Be polite
-            except RequestException as e:
-                continue
-                
-        return self._filter_proxies(proxies)[:self.max_proxies]
+                target_ip = await self._resolve_target(target.host)
+            except OSError:
+                return 'dns_error'
+            lap('dns')
+
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(proxy.ip, proxy.port), self._phase_timeout('connect')
+            )
+        except (OSError, OverflowError, ValueError, asyncio.TimeoutError) as e:  # OverflowError: port > 65535
+            return _connect_failure(e)
+        lap('connect')
+
+        steps = self._probe_steps(proxy.protocol, target, target_ip)
+        phase = result = None
+        try:
+            while True:
+                step = steps.send(result)
+                result = None
+                kind = step[0]
+                if kind == 'phase':
+                    phase = step[1]
+                    timeout = self._phase_timeout(phase)
+                elif kind == 'lap':
+                    lap(step[1])
+                elif kind == 'send':
+                    writer.write(step[1])
+                elif kind == 'recv':
+                    result = await asyncio.wait_for(reader.readexactly(step[1]), timeout)
+                elif kind == 'recv_until':
+                    result = await asyncio.wait_for(reader.readuntil(step[1]), timeout)
+                elif kind == 'tls':
+                    await asyncio.wait_for(_start_tls(writer, self._ssl_context(), step[1]), timeout)
+                else:
+                    chunks = [await asyncio.wait_for(reader.read(65536), timeout)]
+                    if not chunks[0]:
+                        raise ConnectionError("Connection closed before the response")
+                    lap('ttfb')
+                    size = len(chunks[0])
+                    while size < 1 << 20:
+                        chunk = await asyncio.wait_for(reader.read(65536), timeout)
+                        if not chunk:
+                            break
+                        chunks.append(chunk)
+                        size += len(chunk)
+                    result = b''.join(chunks)
+        except StopIteration as stop:
+            failure = stop.value
+        except asyncio.TimeoutError:
+            failure = _PHASE_FAILURES[phase][0]
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            failure = _PHASE_FAILURES[phase][1]
+        finally:
+            writer.close()
+        return self._finish_probe(proxy, failure, started)
+
+    async def _resolve_target(self, host: str) -> str:
+        """IPv4 address of the test host, cached for TARGET_DNS_TTL seconds"""
+        cached = self._target_ips.get(host)
+        if cached is not None and time.monotonic() - cached[0] < self.TARGET_DNS_TTL:
+            return cached[1]
+        addresses = await asyncio.get_running_loop().getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        ip = addresses[0][4][0]
+        self._target_ips[host] = (time.monotonic(), ip)
+        return ip
+
+    def _within_latency(self, total_time: float) -> bool:
+        return self.max_latency is None or total_time <= self.max_latency
+
+    @staticmethod
+    def _check_strategy(strategy: str):
+        if strategy not in ('first', 'fastest'):
+            raise ValueError(f"Unknown strategy {strategy!r}, expected 'first' or 'fastest'")
+
+    @staticmethod
+    def _check_sort_by(sort_by: Optional[str]):
+        if sort_by not in (None, 'latency'):
+            raise ValueError(f"Unknown sort_by {sort_by!r}, expected None or 'latency'")
+
+    @staticmethod
+    def _resolve_sources(sources: Dict[str, Union[str, ProxySource]]) -> List[ProxySource]:
+        """Plain URLs are fpl-list HTML pages, as in SOURCES; ProxySource values declare their own format"""
+        return [
+            value if isinstance(value, ProxySource) else ProxySource(name, value)
+            for name, value in sources.items()
+        ]
 
-    def _parse_source(self, content: bytes, source_name: str) -> List[Dict[str, str]]:
+    def _fresh_candidates(self) -> Optional[List[Proxy]]:
+        """Filtered candidates from the last scrape made by get(), if younger than refresh_after"""
+        if self._candidates is None or time.monotonic() - self._candidates_at > self.refresh_after:
+            return None
+        return list(self._candidates)
+
+    def _remember_candidates(self, proxies: List[Proxy]) -> List[Proxy]:
+        self._candidates = list(proxies)
+        self._candidates_at = time.monotonic()
+        return proxies
+
+    @staticmethod
+    def _remaining(expires: Optional[float]) -> Optional[float]:
+        return None if expires is None else max(0.0, expires - time.monotonic())
+
+    def _coerce_candidates(self, items: Iterable[Union[Proxy, str, Dict[str, Any]]]) -> Iterator[Proxy]:
+        """Lazily turn validate_many() input into proxies, skipping entries that are not one"""
+        for item in items:
+            proxy = _as_proxy(item, self.protocol)
+            if proxy is not None:
+                yield proxy
+
+    def _merge_sources(self, results: Iterable[List[Proxy]]) -> List[Proxy]:
+        """Concatenate per-source results, dropping duplicate ip:port entries and merging their metadata"""
+        merged = {}
+        copied = set()
+        rows = 0
+        for source_proxies in results:
+            rows += len(source_proxies)
+            for proxy in source_proxies:
+                existing = merged.get(proxy)
+                if existing is None:
+                    merged[proxy] = proxy
+                    continue
+                # Per-source lists are cached for 304s and unchanged pages, so merge into a copy
+                if proxy not in copied:
+                    existing = merged[proxy] = existing.copy()
+                    copied.add(proxy)
+                existing.merge(proxy)
+
+        self.last_scrape_report = {'rows': rows, 'unique': len(merged), 'duplicates': rows - len(merged)}
+        return list(merged.values())
+
+    def _request_headers(self, source_name: str) -> Dict[str, str]:
+        """Compression plus validators from the previous fetch, so unchanged pages come back as 304"""
+        headers = {'Accept-Encoding': 'gzip, deflate'}
+        state = self._source_state.get(source_name)
+        if state is not None:
+            if state['etag']:
+                headers['If-None-Match'] = state['etag']
+            if state['last_modified']:
+                headers['If-Modified-Since'] = state['last_modified']
+        return headers
+
+    def _parse_page(self, source: ProxySource, status: int, headers: Mapping, content: bytes) -> List[Proxy]:
+        """Parse a fetched page, reusing the previous result when the server or content hash says it is unchanged"""
+        state = self._source_state.get(source.name)
+        if status == 304:
+            return state['proxies'] if state is not None else []
+
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        if state is not None and state['digest'] == digest:
+            proxies = state['proxies']
+        else:
+            started = time.perf_counter()
+            proxies = self._parse_content(source, content)
+            self.metrics.observe_parse(source.name, time.perf_counter() - started, len(proxies))
+
+        if proxies:
+            self._source_state[source.name] = {
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'digest': digest,
+                'proxies': proxies
+            }
+        return proxies
+
+    def _cached_source(self, source_name: str, allow_stale: bool = False) -> Optional[List[Proxy]]:
+        """Look up a source in the persistent cache, if one is configured"""
+        if self.cache is None:
+            return None
+        return self.cache.get(source_name, allow_stale=allow_stale)
+
+    def _store_source(self, source_name: str, proxies: List[Proxy]) -> List[Proxy]:
+        """Remember a successful parse, or fall back to the last good one if it came back empty"""
+        if self.cache is None:
+            return proxies
+        if not proxies:
+            return self._cached_source(source_name, allow_stale=True) or []
+        self.cache.put(source_name, proxies)
+        return proxies
+
+    def _parse_content(self, source: ProxySource, content: bytes) -> List[Proxy]:
+        """
+        Dispatch a fetched page to the parser for its source's format. A page
+        the JSON or custom parser rejects counts as empty, so it falls back
+        like a failed fetch instead of failing the whole scrape.
+        """
+        if source.parser is None:
+            if source.format == 'text':
+                return _parse_text_list(content, source.protocol)
+            if source.format == 'html':
+                return self._parse_source(content, source.name)
+        try:
+            if source.parser is not None:
+                return list(source.parser(content))
+            return _parse_json_list(content, source.protocol)
+        except (TypeError, ValueError):
+            return []
+
+    def _parse_source(self, content: bytes, source_name: str) -> List[Proxy]:
         """Parse different proxy source formats"""
+        if self.fast_parser:
+            rows = _fast_table_rows(content)
+            if rows is not None:
+                return self._parse_rows(rows, source_name)
+        return self._parse_source_dom(content, source_name)
+
+    def _parse_source_dom(self, content: bytes, source_name: str) -> List[Proxy]:
+        """Parse a source page through the full lxml DOM"""
         tree = html.fromstring(content)
-        rows = tree.xpath('//div[contains(@class, "fpl-list")]/table/tbody/tr')
+        rows = ([cell.text_content().strip() for cell in _CELLS_XPATH(row)] for row in _ROWS_XPATH(tree))
+        return self._parse_rows(rows, source_name)
 
-        
+    def _parse_rows(self, rows: Iterable[List[str]], source_name: str) -> List[Proxy]:
         proxies = []
-        for row in rows:
+        for cells in rows:
             try:
-                cells = [cell.text_content().strip() for cell in row.xpath('./td')]
                 proxy = self._parse_row(cells, source_name)
                 if proxy:
                     proxies.append(proxy)
@@ -118,135 +1945,1302 @@ class FreeProxy:
                 continue
         return proxies
 
-    def _parse_row(self, cells: List[str], source: str) -> Optional[Dict[str, str]]:
+    def _parse_row(self, cells: List[str], source: str) -> Optional[Proxy]:
         """Parse individual proxy row with different formats"""
-        proxy = {}
-        
         try:
             if 'socks-proxy' in source:
-                proxy = {
-                    'ip': cells[0],
-                    'port': cells[1],
-                    'code': cells[2],
-                    'country': cells[3],
-                    'protocol': 'SOCKS5' if 'socks5' in cells[4].lower() else 'SOCKS4',
-                    'anonymity': cells[5],
-                    'https': 'yes' if 'socks' in cells[4].lower() else 'no',
-                    'google': cells[6],
-                    'last_checked': cells[7]
-                }
-            else:
-                proxy = {
-                    'ip': cells[0],
-                    'port': cells[1],
-                    'code': cells[2],
-                    'country': cells[3],
-                    'anonymity': cells[4],
-                    'google': cells[5],
-                    'https': cells[6],
-                    'last_checked': cells[7],
-                    'protocol': 'HTTPS' if cells[6] == 'yes' else 'HTTP'
-                }
-                
-            proxy['region'] = self._detect_region(proxy['country'])
-            return proxy
+                version = cells[4].lower()
+                # ip, port, code, country, protocol, anonymity, https, google, last_checked
+                return Proxy(
+                    cells[0], int(cells[1]), cells[2], cells[3],
+                    Protocol.SOCKS5 if 'socks5' in version else Protocol.SOCKS4,
+                    _parse_anonymity(cells[5]),
+                    'socks' in version,
+                    cells[6].lower() == 'yes',
+                    _parse_last_checked(cells[7])
+                )
+
+            https = cells[6].lower() == 'yes'
+            return Proxy(
+                cells[0], int(cells[1]), cells[2], cells[3],
+                Protocol.HTTPS if https else Protocol.HTTP,
+                _parse_anonymity(cells[4]),
+                https,
+                cells[5].lower() == 'yes',
+                _parse_last_checked(cells[7])
+            )
         except IndexError:
             return None
 
-    def _filter_proxies(self, proxies: List[Dict]) -> List[Dict]:
+    def _filter_proxies(self, proxies: List[Proxy]) -> List[Proxy]:
         """Apply all filters to proxy list"""
         filtered = []
+        # HTTP also accepts HTTPS proxies, as with the old substring match on 'HTTPS'
+        protocols = {protocol for protocol in Protocol if self.protocol.value in protocol.value}
+        countries = set(self.countries)
+        regions = set(self.regions)
+        require_https = self.protocol == Protocol.HTTPS
+        anonymities = {level for level in ProxyAnonymity if self._check_anonymity(level)}
         
         for proxy in proxies:
-            if self.countries and proxy['code'] not in self.countries:
+            if countries and proxy.code not in countries:
                 continue
                 
-            if self.regions and proxy['region'] not in self.regions:
+            if regions and proxy.region not in regions:
                 continue
                 
-            if not self._check_anonymity(proxy['anonymity']):
+            if proxy.anonymity not in anonymities:
                 continue
                 
-            if self.google_compatible and proxy['google'].lower() != 'yes':
+            if self.google_compatible and not proxy.google:
                 continue
                 
-            if self.protocol == Protocol.HTTPS and proxy['https'].lower() != 'yes':
+            if require_https and not proxy.https:
                 continue
                 
-            if self.protocol.value.upper() not in proxy['protocol']:
+            if proxy.protocol not in protocols:
                 continue
                 
             filtered.append(proxy)
-            
+
+        self.metrics.observe_filter(len(proxies), len(filtered))
         return filtered
 
-    def _check_anonymity(self, anonymity: str) -> bool:
+    def _check_anonymity(self, anonymity: ProxyAnonymity) -> bool:
         """Verify anonymity level"""
-        anonymity = anonymity.lower()
         if self.anonymity_level == ProxyAnonymity.ELITE:
-            return 'elite' in anonymity or 'high' in anonymity
+            return anonymity == ProxyAnonymity.ELITE
         elif self.anonymity_level == ProxyAnonymity.ANONYMOUS:
-            return 'anonymous' in anonymity
+            return anonymity == ProxyAnonymity.ANONYMOUS
         return True
 
-    def _detect_region(self, country: str) -> str:
-        """Simple region detection (expand as needed)"""
-        regions = {
-            'North America': ['US', 'CA', 'MX'],
-            'Europe': ['GB', 'DE', 'FR', 'IT', 'ES'],
-            'Asia': ['CN', 'JP', 'KR', 'IN'],
-            'South America': ['BR', 'AR', 'CL']
-        }
-        for region, codes in regions.items():
-            if country in codes:
-                return region
-        return 'Other'
-
-    def get(self, max_retries: int = 3) -> Optional[Dict]:
-        """Get a working proxy with rotation and retries"""
-        proxies = self.get_proxy_list()
-        
-        if self.randomize:
-            random.shuffle(proxies)
-            
-        for proxy in proxies:
-            if self._test_proxy(proxy):
+class FreeProxy(_FreeProxyBase):
+    """
+    Advanced free proxy scraper and validator with support for multiple sources,
+    protocols, and advanced filtering options.
+    
+    Features:
+    - 6 different proxy sources
+    - HTTP/HTTPS/SOCKS support
+    - Country/Region filtering
+    - Anonymity levels
+    - Google compatibility check
+    - Speed/Timeout control
+    - Proxy rotation
+    - Connection validation
+    - Custom test URLs
+    """
+    
+    def __init__(
+        self,
+        *args,
+        warm_pool: bool = False,
+        pool_low: int = 5,
+        pool_high: int = 20,
+        pool_ttl: float = 300.0,
+        concurrency: int = 1000,
+        **kwargs
+    ):
+        """
+        Accepts every _FreeProxyBase option. With warm_pool=True a background
+        thread keeps between pool_low and pool_high validated proxies ready,
+        re-scraping only when the pool drops below pool_low, and get() rotates
+        through them. Pooled proxies older than pool_ttl seconds are dropped.
+        With engine='streams', batch validation runs on an event loop with up
+        to `concurrency` probes in flight.
+        """
+        super().__init__(*args, **kwargs)
+        self.concurrency = concurrency
+        self._throttle = _HostThrottle(self.max_connections_per_host, self.host_delay)
+        self._session = requests.Session()
+        self._session.headers.update({'User-Agent': self.user_agent})
+
+        self.warm_pool = warm_pool
+        self.pool_low = pool_low
+        self.pool_high = max(pool_high, pool_low)
+        self.pool_ttl = pool_ttl
+        self._warm = deque()
+        self._warm_lock = threading.Condition()
+        self._warm_wakeup = threading.Event()
+        self._warm_refills = 0
+        self._warm_stopped = False
+        self._warm_thread = None
+        if warm_pool:
+            self._warm_thread = threading.Thread(target=self._warm_worker, name='freeproxy-warm-pool', daemon=True)
+            self._warm_thread.start()
+
+    def get_proxy_list(self, sort_by: Optional[str] = None) -> List[Proxy]:
+        """
+        Retrieve and filter proxies from all sources.
+
+        With sort_by='latency' every candidate is validated and only the
+        working ones are returned, fastest first.
+        """
+        self._check_sort_by(sort_by)
+        proxies = self._filter_proxies(self._raw_proxies())[:self.max_proxies]
+        if sort_by == 'latency':
+            proxies = sorted(self._validate(proxies, limit=len(proxies)), key=_latency_key)
+        return proxies
+
+    def get_rotating_pool(self, n: int = 20, policy: str = 'round_robin') -> RotatingProxyPool:
+        """Validate up to n proxies and return them in a RotatingProxyPool"""
+        return RotatingProxyPool(self.get_many(n), policy=policy)
+
+    def get_pool(self) -> ProxyPool:
+        """Return every scraped proxy, unfiltered, as an indexed ProxyPool"""
+        return ProxyPool(self._raw_proxies())
+
+    def _raw_proxies(self) -> List[Proxy]:
+        if self.shared_cache_ttl is None:
+            return self._scrape()
+        # Instances with different filters share one raw scrape per process
+        return _shared_scrapes.get(tuple(source.key() for source in self.sources), self.shared_cache_ttl, self._scrape)
+
+    def _scrape(self) -> List[Proxy]:
+        """Fetch every source and return the merged, unfiltered rows"""
+        # Sources are fetched concurrently but merged in registry order
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            return self._merge_sources(executor.map(self._fetch_source, self.sources))
+
+    def save_snapshot(self, path: str, proxies: Optional[Iterable[Proxy]] = None, format: str = 'jsonl') -> int:
+        """
+        Write proxies (by default the validated pool, fastest first) to `path`
+        atomically and return how many were written. format is 'jsonl', one
+        object per line, or 'binary', fixed-width records that
+        load_snapshot() memory-maps. Binary snapshots hold IP addresses only
+        and raise ValueError for a proxy given by host name.
+        """
+        if format not in ('jsonl', 'binary'):
+            raise ValueError(f"Unknown snapshot format {format!r}, expected 'jsonl' or 'binary'")
+        if proxies is None:
+            proxies = self.get_proxy_list(sort_by='latency')
+
+        if format == 'binary':
+            with _atomic_open(path, 'wb') as f:
+                count = _write_binary_snapshot(f, proxies)
+        else:
+            count = 0
+            with _atomic_open(path) as f:
+                for proxy in proxies:
+                    f.write(json.dumps(_snapshot_json(proxy)) + '\n')
+                    count += 1
+        return count
+
+    @staticmethod
+    def load_snapshot(path: str) -> Union[ProxySnapshot, Iterator[Proxy]]:
+        """Open a snapshot: binary ones as a memory-mapped ProxySnapshot, JSONL ones as a lazy iterator"""
+        with open(path, 'rb') as f:
+            magic = f.read(len(_SNAPSHOT_MAGIC))
+        if magic == _SNAPSHOT_MAGIC:
+            return ProxySnapshot(path)
+        return _read_jsonl_snapshot(path)
+
+    @staticmethod
+    def clear_shared_cache():
+        """Drop the process-wide scrape results used with shared_cache_ttl"""
+        _shared_scrapes.clear()
+
+    def _fetch_source(self, source: ProxySource) -> List[Proxy]:
+        """Download and parse a single source, returning an empty list on failure"""
+        cached = self._cached_source(source.name)
+        if cached is not None:
+            return cached
+
+        started = None
+        try:
+            with self._throttle.slot(source.url):  # Be polite
+                started = time.perf_counter()
+                page = self._session.get(
+                    source.url,
+                    headers=self._request_headers(source.name),
+                    timeout=self.timeout,
+                    verify=self.verify_ssl
+                )
+            page.raise_for_status()
+        except RequestException:
+            if started is not None:
+                self.metrics.observe_fetch(source.name, time.perf_counter() - started, 0, 'error')
+            return self._cached_source(source.name, allow_stale=True) or []
+
+        self.metrics.observe_fetch(
+            source.name,
+            time.perf_counter() - started,
+            len(page.content),
+            'not_modified' if page.status_code == 304 else 'ok'
+        )
+        return self._store_source(
+            source.name,
+            self._parse_page(source, page.status_code, page.headers, page.content)
+        )
+
+    def get(self, max_retries: int = 3, strategy: str = 'first', deadline: Optional[float] = None) -> Optional[Proxy]:
+        """
+        Get a working proxy with rotation and retries.
+
+        strategy='first' returns whichever proxy passes first; 'fastest'
+        validates every candidate and returns the one with the lowest latency.
+        Retries reuse the scrape while it is younger than refresh_after and
+        never re-test a candidate; deadline caps the whole call in seconds.
+        """
+        self._check_strategy(strategy)
+        expires = None if deadline is None else time.monotonic() + deadline
+        if self.warm_pool and strategy == 'first':
+            wait = self.timeout * (max_retries + 1)
+            proxy = self._take_warm(wait=wait if deadline is None else min(wait, deadline))
+            if proxy is not None:
                 return proxy
-                
-        if max_retries > 0:
-            self.randomize = True
-            return self.get(max_retries - 1)
-            
+        # Scheduling gets only what the warm pool wait left of the deadline
+        working = self._schedule(1 if strategy == 'first' else None, max_retries, self._remaining(expires))
+        return min(working, key=_latency_key)
+
+    def _candidate_list(self) -> List[Proxy]:
+        proxies = self._fresh_candidates()
+        if proxies is None:
+            proxies = self._remember_candidates(self.get_proxy_list())
+        return proxies
+
+    def _schedule(self, n: Optional[int], max_retries: int, deadline: Optional[float]) -> List[Proxy]:
+        """
+        Retry loop behind get() and get_many(): collect n working proxies
+        (every one that passes when n is None) from candidates not yet tested
+        in this call, re-scraping only once the last scrape has gone stale.
+        """
+        expires = None if deadline is None else time.monotonic() + deadline
+        tested = set()
+        working = []
+
+        for attempt in range(max_retries + 1):
+            candidates = [proxy for proxy in self._candidate_list() if proxy not in tested]
+            if not candidates or self._remaining(expires) == 0:
+                break
+            if self.randomize or attempt:
+                random.shuffle(candidates)
+
+            tested.update(candidates)
+            limit = len(candidates) if n is None else n - len(working)
+            working += self._validate(candidates, limit, timeout=self._remaining(expires))
+            if working and (n is None or len(working) >= n):
+                break
+
+        if working:
+            return working
         raise ProxyException("No working proxies found")
 
-    def _test_proxy(self, proxy: Dict) -> bool:
-        """Test proxy connection with protocol support"""
+    def discard(self, proxy: Proxy):
+        """Drop a proxy that stopped working from the warm pool and remember the failure"""
+        self.health.record(proxy, False)
+        with self._warm_lock:
+            for i, (pooled, _) in enumerate(self._warm):
+                if pooled == proxy:
+                    del self._warm[i]
+                    break
+            if len(self._warm) < self.pool_low:
+                self._warm_wakeup.set()
+
+    def _take_warm(self, wait: float) -> Optional[Proxy]:
+        """Rotate to the next pooled proxy, waiting up to `wait` seconds for a refill if it is empty"""
+        deadline = time.monotonic() + wait
+        with self._warm_lock:
+            refills = self._warm_refills
+            while True:
+                now = time.monotonic()
+                while self._warm and now - self._warm[0][1] > self.pool_ttl:
+                    self._warm.popleft()
+
+                if len(self._warm) < self.pool_low:
+                    self._warm_wakeup.set()
+                if self._warm:
+                    proxy = self._warm[0][0]
+                    self._warm.rotate(-1)
+                    return proxy
+
+                # Give up once a whole refill came back empty, or on timeout
+                if self._warm_refills > refills + 1 or now >= deadline or self._warm_stopped:
+                    return None
+                self._warm_lock.wait(deadline - now)
+
+    def _warm_worker(self):
+        while not self._warm_stopped:
+            if len(self._warm) < self.pool_low:
+                try:
+                    self._refill_warm_pool()
+                except Exception:
+                    time.sleep(self.timeout)  # Keep the worker alive through transient errors
+            self._warm_wakeup.wait(self.pool_ttl)
+            self._warm_wakeup.clear()
+
+    def _refill_warm_pool(self):
+        with self._warm_lock:
+            pooled = {proxy for proxy, _ in self._warm}
+
+        proxies = self.iter_proxies()
+        try:
+            for proxy in proxies:
+                if self._warm_stopped:
+                    break
+                if proxy in pooled:
+                    continue
+                pooled.add(proxy)
+                with self._warm_lock:
+                    self._warm.append((proxy, time.monotonic()))
+                    self._warm_lock.notify_all()
+                    if len(self._warm) >= self.pool_high:
+                        break
+        finally:
+            proxies.close()
+            with self._warm_lock:
+                self._warm_refills += 1
+                self._warm_lock.notify_all()
+
+    def get_many(self, n: int, max_retries: int = 3, deadline: Optional[float] = None) -> List[Proxy]:
+        """Get up to n working proxies, in the order they passed validation"""
+        return self._schedule(n, max_retries, deadline)
+
+    def iter_proxies(self, window: Optional[int] = None) -> Iterator[Proxy]:
+        """
+        Yield working proxies as soon as they pass validation.
+
+        Fetching, parsing, filtering and validation are pipelined: candidates
+        from a source are tested while other sources are still downloading,
+        and at most `window` validations (default: validation_workers) are in
+        flight at once. Stop iterating whenever you have enough proxies.
+        """
+        window = max(1, window or self.validation_workers)
+        fetcher = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+        validator = ThreadPoolExecutor(max_workers=max(1, self.validation_workers))
+
+        if self.shared_cache_ttl is None:
+            fetches = {fetcher.submit(self._fetch_source, source) for source in self.sources}
+        else:
+            fetches = {fetcher.submit(self.get_proxy_list)}
+        checks = {}
+        queue = deque()
+        seen = set()
+
+        try:
+            while fetches or checks or queue:
+                while queue and len(checks) < window:
+                    proxy = queue.popleft().copy()
+                    checks[validator.submit(self._check_proxy, proxy)] = proxy
+
+                done, _ = wait(set(fetches) | set(checks), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetches:
+                        fetches.remove(future)
+                        for proxy in self.health.prioritize(self._filter_proxies(future.result())):
+                            if proxy not in seen and len(seen) < self.max_proxies:
+                                seen.add(proxy)
+                                queue.append(proxy)
+                    else:
+                        proxy = checks.pop(future)
+                        if future.result():
+                            yield proxy
+        finally:
+            for future in list(fetches) + list(checks):
+                future.cancel()
+            fetcher.shutdown(wait=False)
+            validator.shutdown(wait=False)
+            self.health.save()
+
+    def validate_many(
+        self,
+        proxies: Iterable[Union[Proxy, str, Dict[str, Any]]],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+        record_health: Optional[bool] = None
+    ) -> Iterator[Proxy]:
+        """
+        Validate proxies you already have, yielding each one in completion
+        order with its timings (connect_time, ttfb, total_time, phases) and
+        `failure` set; it passed when `failure` is None.
+
+        `proxies` may be any iterable, including a lazy generator, of Proxy
+        records, `ip:port` strings or proxy dicts; unparseable entries are
+        skipped. Items are pulled only as slots free up, so at most
+        `concurrency` (default: validation_workers, or concurrency with
+        engine='streams') are held at once. After `deadline` seconds
+        unfinished checks are dropped and iteration stops. Each proxy is
+        tested with its own protocol; strings default to the client's.
+
+        Outcomes are kept in `health` (one record per proxy, for good) only
+        with record_health=True, or by default when it is persisted to a file.
+        """
+        expires = None if deadline is None else time.monotonic() + deadline
+        results = self._validate_iter(self._coerce_candidates(proxies), concurrency, expires, record_health)
+        try:
+            for proxy, _ in results:
+                yield proxy
+        finally:
+            results.close()
+
+    def _validate_iter(
+        self,
+        proxies: Iterable[Proxy],
+        window: Optional[int] = None,
+        expires: Optional[float] = None,
+        record_health: Optional[bool] = None
+    ) -> Iterator[Tuple[Proxy, bool]]:
+        """
+        Validate a possibly endless iterable of proxies, yielding (proxy,
+        passed) in completion order. Candidates are pulled from `proxies` only
+        as slots free up, so at most `window` are held at a time (default:
+        validation_workers, or concurrency with engine='streams'). Stops once
+        the monotonic time `expires` passes, dropping unfinished checks.
+
+        Outcomes go into `health` only with record_health=True, by default
+        only when it is persisted to a file: one record per distinct proxy
+        would otherwise grow without bound over a long input.
+        """
+        candidates = iter(proxies)
+        record = self.health.path is not None if record_health is None else record_health
+        if self.engine == 'streams':
+            yield from self._validate_iter_streams(candidates, max(1, window or self.concurrency), expires, record)
+            return
+
+        window = max(1, window or self.validation_workers)
+        executor = ThreadPoolExecutor(max_workers=window)
+        checks = {}
+        try:
+            while True:
+                for proxy in itertools.islice(candidates, window - len(checks)):
+                    checks[executor.submit(self._check_proxy, proxy, None, record)] = proxy
+                if not checks:
+                    break
+                done, _ = wait(checks, timeout=self._remaining(expires), return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    yield checks.pop(future), future.result()
+        finally:
+            for future in checks:
+                future.cancel()
+            executor.shutdown(wait=False)
+            self.health.save()
+
+    def _validate_iter_streams(
+        self,
+        candidates: Iterator[Proxy],
+        window: int,
+        expires: Optional[float],
+        record: bool
+    ) -> Iterator[Tuple[Proxy, bool]]:
+        """_validate_iter on a private event loop, driven one completion batch at a time"""
+        loop = asyncio.new_event_loop()
+
+        async def check(proxy: Proxy) -> Tuple[Proxy, bool]:
+            success = await self._stream_test(proxy)
+            if record:
+                self.health.record(proxy, success)
+            return proxy, success
+
+        tasks = set()
+        try:
+            while True:
+                for proxy in itertools.islice(candidates, window - len(tasks)):
+                    tasks.add(loop.create_task(check(proxy)))
+                if not tasks:
+                    break
+                done, tasks = loop.run_until_complete(
+                    asyncio.wait(tasks, timeout=self._remaining(expires), return_when=asyncio.FIRST_COMPLETED)
+                )
+                if not done:
+                    break
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+            self.health.save()
+
+    def _validate(self, proxies: List[Proxy], limit: int, timeout: Optional[float] = None) -> List[Proxy]:
+        """Test proxies concurrently and stop as soon as `limit` of them pass, or after `timeout` seconds"""
+        working = []
+        if limit <= 0 or not proxies:
+            return working
+
+        expires = None if timeout is None else time.monotonic() + timeout
+        proxies = [proxy.copy() for proxy in self.health.prioritize(proxies)]
+        report = self.last_validation_report = {
+            'candidates': len(proxies),
+            'precheck_removed': 0,
+            'precheck_seconds': 0.0,
+            'http_removed': 0,
+            'http_seconds': 0.0,
+            'passed': 0
+        }
+
+        connect_times = {}
+        tested = []
+        if self.precheck_timeout is not None:
+            started = time.perf_counter()
+            connect_times = self._precheck(proxies, timeout)
+            tested = [proxy for proxy in proxies if proxy not in connect_times]
+            proxies = [proxy for proxy in proxies if proxy in connect_times]
+            report['precheck_removed'] = report['candidates'] - len(proxies)
+            report['precheck_seconds'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        probed = []
+        try:
+            if self.engine == 'streams':
+                working = asyncio.run(self._validate_streams(proxies, limit, self._remaining(expires), probed))
+            else:
+                working = self._validate_threads(proxies, connect_times, limit, self._remaining(expires), probed)
+        finally:
+            self.health.save()
+            report['http_removed'] = len(probed) - len(working)
+            report['http_seconds'] = time.perf_counter() - started
+            report['passed'] = len(working)
+            report.update(_summarize_probes(tested + probed))
+        return working
+
+    def _validate_threads(
+        self,
+        proxies: List[Proxy],
+        connect_times: Dict[Proxy, float],
+        limit: int,
+        timeout: Optional[float],
+        probed: List[Proxy]
+    ) -> List[Proxy]:
+        """HTTP stage on validation_workers threads; every finished proxy is appended to `probed`"""
+        working = []
+        executor = ThreadPoolExecutor(max_workers=max(1, self.validation_workers))
+        futures = {
+            executor.submit(self._check_proxy, proxy, connect_times.get(proxy)): proxy
+            for proxy in proxies
+        }
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                probed.append(futures[future])
+                if future.result():
+                    working.append(futures[future])
+                    if len(working) >= limit:
+                        break
+        except FutureTimeoutError:
+            pass
+        finally:
+            # Drop queued candidates; probes already in flight finish on their own timeout
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        return working
+
+    async def _validate_streams(
+        self,
+        proxies: List[Proxy],
+        limit: int,
+        timeout: Optional[float],
+        probed: List[Proxy]
+    ) -> List[Proxy]:
+        """HTTP stage on one event loop with the streams engine, at most `concurrency` probes in flight"""
+        working = []
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def check(proxy: Proxy) -> Optional[Proxy]:
+            async with semaphore:
+                success = await self._stream_test(proxy)
+            self.health.record(proxy, success)
+            probed.append(proxy)
+            return proxy if success else None
+
+        tasks = [asyncio.ensure_future(check(proxy)) for proxy in proxies]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=timeout):
+                proxy = await next_done
+                if proxy is not None:
+                    working.append(proxy)
+                    if len(working) >= limit:
+                        break
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return working
+
+    def _precheck(self, proxies: List[Proxy], timeout: Optional[float] = None) -> Dict[Proxy, float]:
+        """
+        First validation stage: a bare TCP connect to every candidate, with
+        up to precheck_workers connects in flight on one event loop.
+        Candidates still connecting after `timeout` seconds are dropped.
+        """
+        return asyncio.run(self._precheck_all(proxies, timeout))
+
+    async def _precheck_all(self, proxies: List[Proxy], timeout: Optional[float]) -> Dict[Proxy, float]:
+        connect_times = {}
+        semaphore = asyncio.Semaphore(max(1, self.precheck_workers))
+
+        async def check(proxy: Proxy):
+            async with semaphore:
+                connect_time = await self._tcp_precheck(proxy)
+            if connect_time is None:
+                self.health.record(proxy, False)
+            else:
+                connect_times[proxy] = connect_time
+
+        tasks = [asyncio.ensure_future(check(proxy)) for proxy in proxies]
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return connect_times
+
+    def _check_proxy(self, proxy: Proxy, connect_time: Optional[float] = None, record: bool = True) -> bool:
+        """Test a proxy and, unless record is False, remember the outcome"""
+        if connect_time is None and self.precheck_timeout is not None:
+            connect_time, failure = _tcp_connect(proxy.ip, proxy.port, self.precheck_timeout)
+            if connect_time is None:
+                proxy.phases, proxy.failure = None, failure
+                if record:
+                    self.health.record(proxy, False)
+                self.metrics.observe_validation(failure)
+                return False
+
+        success = self._test_proxy(proxy, connect_time)
+        if record:
+            self.health.record(proxy, success)
+        return success
+
+    def _test_proxy(self, proxy: Proxy, connect_time: Optional[float] = None) -> bool:
+        """Test proxy connection with protocol support, recording its timings"""
+        started = time.perf_counter()
+        proxy._set_timings(None, None, None)
+        proxy.phases = None
+        # One-off probes with the streams engine use its blocking twin rather than a fresh event loop
+        if self.phase_timing or self.engine == 'streams':
+            failure = self._probe_phases(proxy)
+        else:
+            failure = self._probe(proxy, connect_time)
+        return self._record_probe(proxy, failure, started)
+
+    def _probe(self, proxy: Proxy, connect_time: Optional[float]) -> Optional[str]:
+        """Run the validation request through the proxy, returning why it failed or None"""
         proxies = {
-            'http': f"{self.protocol.value}://{proxy['ip']}:{proxy['port']}",
-            'https': f"{self.protocol.value}://{proxy['ip']}:{proxy['port']}"
+            'http': self._probe_proxy_url(proxy),
+            'https': self._probe_proxy_url(proxy)
         }
-        
+
         try:
-            response = self._session.get(
+            started = time.perf_counter()
+            with self._session.get(
                 self.test_url,
                 proxies=proxies,
-                timeout=self.timeout,
-                verify=self.verify_ssl
-            )
-            
-            # Additional verification for Google compatibility
-            if self.google_compatible:
-                return 'google' in response.text.lower()
-                
-            return response.status_code == 200
+                timeout=(self._phase_timeout('connect'), self._phase_timeout('ttfb')),
+                verify=self.verify_ssl,
+                stream=True
+            ) as response:
+                ttfb = response.elapsed.total_seconds()
+                response.content
+            total_time = time.perf_counter() - started
+        except RequestException as e:
+            return _request_failure(e)
         except Exception:
-            return False
+            return 'error'
+
+        # Additional verification for Google compatibility
+        if self.google_compatible:
+            if 'google' not in response.text.lower():
+                return 'content_mismatch'
+        elif response.status_code != 200:
+            return 'bad_status'
+
+        # requests does not expose its connect time; only a precheck measures one on this path
+        proxy._set_timings(connect_time, ttfb, total_time)
+        proxy.phases = {'ttfb': ttfb} if connect_time is None else {'connect': connect_time, 'ttfb': ttfb}
+        return None if self._within_latency(total_time) else 'too_slow'
+
+    def _probe_phases(self, proxy: Proxy) -> Optional[str]:
+        """
+        Run _probe_steps() on a blocking socket, timing DNS, connect, the
+        tunnel (CONNECT or SOCKS handshake), TLS and TTFB separately, each
+        with its own timeout from phase_timeouts.
+        """
+        target = self._probe_target()
+        socks = proxy.protocol in (Protocol.SOCKS4, Protocol.SOCKS5)
+        phases = proxy.phases = {}
+        started = mark = time.perf_counter()
+
+        def lap(phase: str):
+            nonlocal mark
+            now = time.perf_counter()
+            phases[phase] = now - mark
+            mark = now
+
+        try:
+            family, kind, _, _, address = socket.getaddrinfo(proxy.ip, proxy.port, type=socket.SOCK_STREAM)[0]
+            # socks4:// and socks5:// resolve the target locally, as requests does
+            target_ip = socket.gethostbyname(target.host) if socks else None
+        except OSError:
+            return 'dns_error'
+        lap('dns')
+
+        sock = socket.socket(family, kind)
+        try:
+            sock.settimeout(self._phase_timeout('connect'))
+            try:
+                sock.connect(address)
+            except OSError as e:
+                return _connect_failure(e)
+            lap('connect')
+
+            steps = self._probe_steps(proxy.protocol, target, target_ip)
+            phase = result = None
+            try:
+                while True:
+                    step = steps.send(result)
+                    result = None
+                    kind = step[0]
+                    if kind == 'phase':
+                        phase = step[1]
+                        sock.settimeout(self._phase_timeout(phase))
+                    elif kind == 'lap':
+                        lap(step[1])
+                    elif kind == 'send':
+                        sock.sendall(step[1])
+                    elif kind == 'recv':
+                        result = _recv_exactly(sock, step[1])
+                    elif kind == 'recv_until':
+                        result = _recv_until(sock, step[1])
+                    elif kind == 'tls':
+                        sock = self._ssl_context().wrap_socket(sock, server_hostname=step[1])
+                    else:
+                        chunks = [sock.recv(65536)]
+                        if not chunks[0]:
+                            raise ConnectionError("Connection closed before the response")
+                        lap('ttfb')
+                        size = len(chunks[0])
+                        while size < 1 << 20:
+                            chunk = sock.recv(65536)
+                            if not chunk:
+                                break
+                            chunks.append(chunk)
+                            size += len(chunk)
+                        result = b''.join(chunks)
+            except StopIteration as stop:
+                failure = stop.value
+            except socket.timeout:
+                failure = _PHASE_FAILURES[phase][0]
+            except OSError:
+                failure = _PHASE_FAILURES[phase][1]
+        finally:
+            sock.close()
+        return self._finish_probe(proxy, failure, started)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._session.close()
+        self.close()
 
     def close(self):
-        self._session.close()
\ No newline at end of file
+        if self._warm_thread is not None:
+            with self._warm_lock:
+                self._warm_stopped = True
+                self._warm_lock.notify_all()
+            self._warm_wakeup.set()
+            self._warm_thread.join(timeout=1.0)
+        self._session.close()
+        self.health.save()
+
+class AsyncFreeProxy(_FreeProxyBase):
+    """
+    asyncio version of FreeProxy built on aiohttp.
+
+    Accepts the same options as FreeProxy plus `concurrency`, the number of
+    validations allowed in flight at once on the event loop. SOCKS protocols
+    additionally need the aiohttp-socks package.
+    """
+
+    def __init__(self, *args, concurrency: int = 1000, **kwargs):
+        if aiohttp is None:
+            raise ProxyException("AsyncFreeProxy requires aiohttp (pip install aiohttp)")
+        super().__init__(*args, **kwargs)
+        self.concurrency = concurrency
+        self._throttle = _AsyncHostThrottle(self.max_connections_per_host, self.host_delay)
+        self._session = None
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={'User-Agent': self.user_agent},
+                connector=aiohttp.TCPConnector(limit=self.concurrency, ssl=None if self.verify_ssl else False),
+                trace_configs=[self._trace_config()]
+            )
+        return self._session
+
+    @staticmethod
+    def _trace_config() -> 'aiohttp.TraceConfig':
+        """Times DNS and connection setup for requests made with a SimpleNamespace trace_request_ctx"""
+        async def on_start(session, context, params):
+            if context.trace_request_ctx is not None:
+                context.trace_request_ctx.connect_started = time.perf_counter()
+
+        async def on_end(session, context, params):
+            ctx = context.trace_request_ctx
+            if ctx is not None:
+                ctx.connect_time = time.perf_counter() - ctx.connect_started
+
+        async def on_dns_start(session, context, params):
+            if context.trace_request_ctx is not None:
+                context.trace_request_ctx.dns_started = time.perf_counter()
+
+        async def on_dns_end(session, context, params):
+            ctx = context.trace_request_ctx
+            if ctx is not None:
+                ctx.dns_time = time.perf_counter() - ctx.dns_started
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_start.append(on_start)
+        trace_config.on_connection_create_end.append(on_end)
+        trace_config.on_dns_resolvehost_start.append(on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_end)
+        return trace_config
+
+    async def get_proxy_list(self, sort_by: Optional[str] = None) -> List[Proxy]:
+        """Retrieve and filter proxies from all sources; see FreeProxy.get_proxy_list"""
+        self._check_sort_by(sort_by)
+        results = await asyncio.gather(*(self._fetch_source(source) for source in self.sources))
+        proxies = self._filter_proxies(self._merge_sources(results))[:self.max_proxies]
+        if sort_by == 'latency':
+            proxies = sorted([proxy async for proxy in self.iter_valid(proxies)], key=_latency_key)
+        return proxies
+
+    async def _fetch_source(self, source: ProxySource) -> List[Proxy]:
+        """Download and parse a single source, returning an empty list on failure"""
+        cached = self._cached_source(source.name)
+        if cached is not None:
+            return cached
+
+        started = None
+        try:
+            async with self._throttle.slot(source.url):  # Be polite
+                started = time.perf_counter()
+                async with self._get_session().get(
+                    source.url,
+                    headers=self._request_headers(source.name),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+                ) as page:
+                    page.raise_for_status()
+                    content = await page.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if started is not None:
+                self.metrics.observe_fetch(source.name, time.perf_counter() - started, 0, 'error')
+            return self._cached_source(source.name, allow_stale=True) or []
+
+        self.metrics.observe_fetch(
+            source.name,
+            time.perf_counter() - started,
+            len(content),
+            'not_modified' if page.status == 304 else 'ok'
+        )
+        return self._store_source(source.name, self._parse_page(source, page.status, page.headers, content))
+
+    async def get(self, max_retries: int = 3, strategy: str = 'first', deadline: Optional[float] = None) -> Optional[Proxy]:
+        """Get a working proxy with rotation and retries; see FreeProxy.get"""
+        self._check_strategy(strategy)
+        working = await self._schedule(1 if strategy == 'first' else None, max_retries, deadline)
+        return min(working, key=_latency_key)
+
+    async def get_many(self, n: int, max_retries: int = 3, deadline: Optional[float] = None) -> List[Proxy]:
+        """Get up to n working proxies, in the order they passed validation"""
+        return await self._schedule(n, max_retries, deadline)
+
+    async def _candidate_list(self) -> List[Proxy]:
+        proxies = self._fresh_candidates()
+        if proxies is None:
+            proxies = self._remember_candidates(await self.get_proxy_list())
+        return proxies
+
+    async def _schedule(self, n: Optional[int], max_retries: int, deadline: Optional[float]) -> List[Proxy]:
+        """Retry loop behind get() and get_many(); see FreeProxy._schedule"""
+        expires = None if deadline is None else time.monotonic() + deadline
+        tested = set()
+        working = []
+
+        async def collect(candidates: List[Proxy]):
+            passed = self.iter_valid(candidates)
+            try:
+                async for proxy in passed:
+                    working.append(proxy)
+                    if n is not None and len(working) >= n:
+                        break
+            finally:
+                await passed.aclose()  # Cancels the probes still in flight
+
+        for attempt in range(max_retries + 1):
+            candidates = [proxy for proxy in await self._candidate_list() if proxy not in tested]
+            if not candidates or self._remaining(expires) == 0:
+                break
+            if self.randomize or attempt:
+                random.shuffle(candidates)
+
+            tested.update(candidates)
+            try:
+                await asyncio.wait_for(collect(candidates), self._remaining(expires))
+            except asyncio.TimeoutError:
+                break
+            if working and (n is None or len(working) >= n):
+                break
+
+        if working:
+            return working
+        raise ProxyException("No working proxies found")
+
+    async def iter_valid(self, proxies: Optional[Iterable[Proxy]] = None) -> AsyncIterator[Proxy]:
+        """Yield proxies as soon as they pass validation; scrapes when none are given"""
+        if proxies is None:
+            proxies = await self.get_proxy_list()
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        tested = []
+        passed = 0
+
+        async def check(proxy: Proxy) -> Optional[Proxy]:
+            async with semaphore:
+                success = await self._precheck(proxy) and await self._test_proxy(proxy)
+            self.health.record(proxy, success)
+            tested.append(proxy)
+            return proxy if success else None
+
+        tasks = [asyncio.ensure_future(check(proxy.copy())) for proxy in self.health.prioritize(list(proxies))]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                proxy = await next_done
+                if proxy is not None:
+                    passed += 1
+                    yield proxy
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.last_validation_report = {'candidates': len(tasks), 'passed': passed, **_summarize_probes(tested)}
+
+    async def validate_many(
+        self,
+        proxies: Union[Iterable[Union[Proxy, str, Dict[str, Any]]], AsyncIterable[Union[Proxy, str, Dict[str, Any]]]],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+        record_health: Optional[bool] = None
+    ) -> AsyncIterator[Proxy]:
+        """
+        Async counterpart of FreeProxy.validate_many(): also accepts async
+        iterables, and holds at most `concurrency` (default: the client's
+        concurrency) items at a time.
+        """
+        expires = None if deadline is None else time.monotonic() + deadline
+        record = self.health.path is not None if record_health is None else record_health
+        window = max(1, concurrency or self.concurrency)
+        if isinstance(proxies, AsyncIterable):
+            items = proxies.__aiter__()
+        else:
+            items = None
+            candidates = iter(proxies)
+
+        async def next_candidate() -> Optional[Proxy]:
+            """The next parseable item, or None when the input is exhausted"""
+            while True:
+                if items is None:
+                    try:
+                        item = next(candidates)
+                    except StopIteration:
+                        return None
+                else:
+                    try:
+                        item = await items.__anext__()
+                    except StopAsyncIteration:
+                        return None
+                proxy = _as_proxy(item, self.protocol)
+                if proxy is not None:
+                    return proxy
+
+        async def check(proxy: Proxy) -> Proxy:
+            success = await self._precheck(proxy) and await self._test_proxy(proxy)
+            if record:
+                self.health.record(proxy, success)
+            return proxy
+
+        tasks = set()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(tasks) < window:
+                    proxy = await next_candidate()
+                    if proxy is None:
+                        exhausted = True
+                    else:
+                        tasks.add(asyncio.ensure_future(check(proxy)))
+                if not tasks:
+                    break
+                done, tasks = await asyncio.wait(tasks, timeout=self._remaining(expires), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _precheck(self, proxy: Proxy) -> bool:
+        """Cheap TCP connect before the HTTP test, when precheck_timeout is set"""
+        return self.precheck_timeout is None or await self._tcp_precheck(proxy) is not None
+
+    async def _test_proxy(self, proxy: Proxy) -> bool:
+        """Test proxy connection with protocol support, recording its timings"""
+        if self.engine == 'streams':
+            return await self._stream_test(proxy)
+        started = time.perf_counter()
+        proxy._set_timings(None, None, None)
+        proxy.phases = None
+        return self._record_probe(proxy, await self._probe(proxy), started)
+
+    async def _probe(self, proxy: Proxy) -> Optional[str]:
+        """Run the validation request through the proxy, returning why it failed or None"""
+        proxy_url = self._probe_proxy_url(proxy)
+        timeout = aiohttp.ClientTimeout(
+            total=self._probe_timeout(),
+            sock_connect=self.phase_timeouts.get('connect'),
+            sock_read=self.phase_timeouts.get('ttfb')
+        )
+        trace = SimpleNamespace(connect_time=None, dns_time=None)
+
+        try:
+            started = time.perf_counter()
+            if proxy.protocol in (Protocol.SOCKS4, Protocol.SOCKS5):
+                if ProxyConnector is None:
+                    raise ProxyException("SOCKS validation requires aiohttp-socks (pip install aiohttp-socks)")
+                connector = ProxyConnector.from_url(proxy_url, ssl=None if self.verify_ssl else False)
+                async with aiohttp.ClientSession(
+                    connector=connector,
+                    headers={'User-Agent': self.user_agent},
+                    trace_configs=[self._trace_config()]
+                ) as session:
+                    async with session.get(self.test_url, timeout=timeout, trace_request_ctx=trace) as response:
+                        failure, ttfb = await self._check_response(response, started)
+            else:
+                async with self._get_session().get(
+                    self.test_url, proxy=proxy_url, timeout=timeout, trace_request_ctx=trace
+                ) as response:
+                    failure, ttfb = await self._check_response(response, started)
+            total_time = time.perf_counter() - started
+        except ProxyException:
+            raise
+        except Exception as e:
+            return self._failure(e, connected=trace.connect_time is not None)
+
+        proxy.phases = {
+            phase: seconds
+            for phase, seconds in (('dns', trace.dns_time), ('connect', trace.connect_time), ('ttfb', ttfb))
+            if seconds is not None
+        }
+        if failure is not None:
+            return failure
+        proxy._set_timings(trace.connect_time, ttfb, total_time)
+        return None if self._within_latency(total_time) else 'too_slow'
+
+    @staticmethod
+    def _failure(error: Exception, connected: bool) -> str:
+        """Failure reason for an error raised by aiohttp or aiohttp-socks while probing"""
+        if isinstance(error, aiohttp.ClientHttpProxyError):
+            return 'tunnel_rejected'
+        if isinstance(error, aiohttp.ClientSSLError):
+            return 'tls_error'
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return _connect_failure(error.os_error)
+        if isinstance(error, asyncio.TimeoutError):
+            return 'read_timeout' if connected else 'connect_timeout'
+        if SocksProxyError is not None and isinstance(error, SocksProxyError):
+            return 'tunnel_rejected'
+        if isinstance(error, OSError):
+            return _connect_failure(error)
+        return 'connection_error'
+
+    async def _check_response(self, response: 'aiohttp.ClientResponse', started: float) -> Tuple[Optional[str], float]:
+        """Read the test response, returning the failure reason (None if it passed) and the TTFB"""
+        ttfb = time.perf_counter() - started
+        body = await response.read()
+
+        # Additional verification for Google compatibility
+        if self.google_compatible:
+            return (None if b'google' in body.lower() else 'content_mismatch'), ttfb
+
+        return (None if response.status == 200 else 'bad_status'), ttfb
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+        self.health.save()
+
+_OUTPUT_FIELDS = ('ip', 'port', 'protocol', 'code', 'country', 'anonymity', 'connect_time', 'ttfb', 'total_time', 'failure')
+
+def _read_proxy_lines(stream, protocol: Protocol) -> Iterator[Proxy]:
+    """Lazily turn `ip:port` / `scheme://ip:port` lines of a binary stream into proxies"""
+    https = protocol == Protocol.HTTPS
+    for line in stream:
+        match = _TEXT_PROXY.match(line)
+        if match is None:
+            continue
+        scheme, ip, port = match.groups()
+        port = int(port)
+        if not 0 < port <= 65535:
+            continue
+        row_protocol = _SCHEMES.get(scheme.decode('ascii').lower(), protocol) if scheme else protocol
+        yield Proxy(
+            ip.decode('ascii'), port, '', '', row_protocol,
+            https=row_protocol == Protocol.HTTPS if scheme else https
+        )
+
+def _format_output(proxy: Proxy, passed: bool, output: str) -> str:
+    if output == 'jsonl':
+        data = _snapshot_json(proxy)
+        data['ok'] = passed
+        data['failure'] = proxy.failure
+        if proxy.phases:
+            data['phases'] = proxy.phases
+        return json.dumps(data)
+    if output == 'csv':
+        data = _snapshot_json(proxy)
+        data['failure'] = proxy.failure
+        return ','.join('' if data[field] is None else str(data[field]) for field in _OUTPUT_FIELDS)
+    return f"{proxy.protocol.value}://{proxy.address}"
+
+def _phase_timeout_arg(value: str) -> Tuple[str, float]:
+    phase, _, seconds = value.partition('=')
+    if phase not in _FreeProxyBase.PHASE_TIMEOUTS:
+        raise argparse.ArgumentTypeError(f"unknown phase {phase!r}, expected one of {_FreeProxyBase.PHASE_TIMEOUTS}")
+    try:
+        return phase, float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected phase=seconds, got {value!r}")
+
+def _argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='freeproxy',
+        description='Scrape, filter and validate free proxies, or validate a list of ip:port lines, '
+                    'streaming working proxies to stdout as they pass.'
+    )
+    parser.add_argument('-i', '--input', help="validate proxies read from this file ('-' for stdin) instead of scraping")
+    parser.add_argument('--country', dest='countries', action='append', help='repeatable')
+    parser.add_argument('--region', dest='regions', action='append', help='repeatable')
+    parser.add_argument('--protocol', default=Protocol.HTTP.value, choices=[protocol.value for protocol in Protocol],
+                        help='protocol to filter on, and to assume for input lines without a scheme')
+    parser.add_argument('--anonymity', default=ProxyAnonymity.TRANSPARENT.name.lower(),
+                        choices=[level.name.lower() for level in ProxyAnonymity], help='anonymity level to match exactly')
+    parser.add_argument('--google', action='store_true', help='only Google-compatible proxies')
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--test-url', default='https://www.google.com')
+    parser.add_argument('--max-proxies', type=int, default=100, help='candidates to test when scraping')
+    parser.add_argument('--verify-ssl', action='store_true')
+    parser.add_argument('--user-agent')
+    parser.add_argument('--max-workers', type=int, default=6, help='parallel source fetches')
+    parser.add_argument('--cache', help='SQLite file caching source pages between runs')
+    parser.add_argument('--health', help='file keeping per-proxy failure history between runs (one record per proxy tested)')
+    parser.add_argument('--max-latency', type=float)
+    parser.add_argument('--precheck-timeout', type=float)
+    parser.add_argument('--phase-timeout', dest='phase_timeouts', action='append', type=_phase_timeout_arg,
+                        metavar='PHASE=SECONDS', help=f"repeatable, phases: {', '.join(_FreeProxyBase.PHASE_TIMEOUTS)}")
+    parser.add_argument('--engine', default='client', choices=_FreeProxyBase.ENGINES)
+    parser.add_argument('-c', '--concurrency', type=int, default=None,
+                        help='validations in flight (default: 20 threads, or 1000 with --engine streams)')
+    parser.add_argument('-n', '--limit', type=int, help='stop after this many working proxies')
+    parser.add_argument('-f', '--format', dest='output', default='text', choices=('text', 'jsonl', 'csv'))
+    parser.add_argument('--all', action='store_true', help='also print proxies that failed, with the reason')
+    parser.add_argument('--no-validate', action='store_true', help='print candidates without testing them')
+    parser.add_argument('-q', '--quiet', action='store_true', help='no banner or summary on stderr')
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point (`python -m freeproxy`). Exits 0 when at least
+    one proxy was printed, 1 otherwise.
+
+    Input is read line by line and at most --concurrency proxies are in
+    flight, so memory stays flat however long the list is. Only --health
+    keeps anything per proxy: one history record each. A `scheme://` on an
+    input line picks the protocol that proxy is tested with.
+    """
+    args = _argument_parser().parse_args(argv)
+    if not args.quiet and sys.stderr.isatty():
+        print(_BANNER, file=sys.stderr)
+
+    protocol = Protocol(args.protocol)
+    fp = FreeProxy(
+        countries=args.countries,
+        regions=args.regions,
+        protocol=protocol,
+        anonymity_level=ProxyAnonymity[args.anonymity.upper()],
+        google_compatible=args.google,
+        timeout=args.timeout,
+        test_url=args.test_url,
+        max_proxies=args.max_proxies,
+        verify_ssl=args.verify_ssl,
+        user_agent=args.user_agent,
+        max_workers=args.max_workers,
+        validation_workers=args.concurrency or 20,
+        cache=args.cache,
+        health=args.health,
+        max_latency=args.max_latency,
+        precheck_timeout=args.precheck_timeout,
+        phase_timeouts=dict(args.phase_timeouts or ()),
+        engine=args.engine,
+        concurrency=args.concurrency or 1000
+    )
+
+    source = None
+    if args.input == '-':
+        candidates = _read_proxy_lines(sys.stdin.buffer, protocol)
+    elif args.input:
+        source = open(args.input, 'rb')
+        candidates = _read_proxy_lines(source, protocol)
+    else:
+        candidates = iter(fp.get_proxy_list())
+
+    results = candidates if args.no_validate else fp.validate_many(candidates, concurrency=args.concurrency)
+
+    tested = working = 0
+    status = 1
+    try:
+        if args.output == 'csv':
+            print(','.join(_OUTPUT_FIELDS), flush=True)
+        for proxy in results:
+            passed = proxy.failure is None
+            tested += 1
+            working += passed
+            if passed or args.all:
+                print(_format_output(proxy, passed, args.output), flush=True)
+            if args.limit is not None and working >= args.limit:
+                break
+        status = 0 if working else 1
+    except KeyboardInterrupt:
+        status = 130
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); keep the interpreter from complaining on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        status = 0 if working else 1
+    finally:
+        if hasattr(results, 'close'):
+            results.close()
+        if source is not None:
+            source.close()
+        fp.close()
+
+    if not args.quiet:
+        if args.no_validate:
+            print(f"{tested} candidates", file=sys.stderr)
+        else:
+            print(f"{working} working of {tested} tested", file=sys.stderr)
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())